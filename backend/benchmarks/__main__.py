@@ -0,0 +1,113 @@
+"""
+Load-test the API in-process and compare against a stored baseline.
+
+Usage (from the backend directory):
+    python -m benchmarks
+    python -m benchmarks --scenario jwt_login --scenario users_me -c 32 -n 500
+    python -m benchmarks --save-baseline
+    python -m benchmarks --database-url postgresql+asyncpg://u:p@localhost/bench
+
+Client and app share one process and event loop, so absolute numbers are
+lower than against a deployed server; compare runs made on the same
+machine with the same settings. Exits with status 1 on failed requests or
+when a metric regresses by more than --tolerance.
+
+benchmarks/baseline.json is the committed reference (defaults: -n 200
+-c 16, SQLite). Each scenario is printed with its baseline row and the
+change per metric; re-record it with --save-baseline when a change is
+meant to move the numbers.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from benchmarks.harness import benchmark_client
+from benchmarks.runner import (
+    compare,
+    format_results,
+    load_baseline,
+    run_scenario,
+    save_baseline,
+)
+from benchmarks.scenarios import SCENARIOS
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+async def main(args: argparse.Namespace) -> int:
+    results = []
+    async with benchmark_client(args.database_url) as client:
+        for name in args.scenario or SCENARIOS:
+            print(f"running {name}...", file=sys.stderr)
+            results.append(
+                await run_scenario(
+                    client,
+                    SCENARIOS[name],
+                    requests=args.requests,
+                    concurrency=args.concurrency,
+                )
+            )
+
+    baseline = load_baseline(args.baseline)
+    print(format_results(results, baseline))
+    if args.output:
+        args.output.write_text(
+            json.dumps([asdict(result) for result in results], indent=2) + "\n"
+        )
+
+    exit_code = 0
+    if failed := [result.name for result in results if result.errors]:
+        print(f"\nfailed requests in: {', '.join(failed)}", file=sys.stderr)
+        exit_code = 1
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.requests, args.concurrency)
+        print(f"\nbaseline saved to {args.baseline}", file=sys.stderr)
+    elif baseline is not None:
+        if (baseline.get("requests"), baseline.get("concurrency")) != (
+            args.requests,
+            args.concurrency,
+        ):
+            print(
+                "\nwarning: baseline was recorded with "
+                f"requests={baseline.get('requests')} "
+                f"concurrency={baseline.get('concurrency')}",
+                file=sys.stderr,
+            )
+        if regressions := compare(results, baseline, args.tolerance):
+            print("\nregressions:", *regressions, sep="\n  ", file=sys.stderr)
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the API endpoints")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="scenario to run, repeatable (default: all)",
+    )
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--database-url",
+        help="throwaway database to use instead of a temporary SQLite file",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="record this run as the baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed relative regression before failing (default: 0.2)",
+    )
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    sys.exit(asyncio.run(main(parser.parse_args())))
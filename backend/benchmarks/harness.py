@@ -0,0 +1,110 @@
+"""
+Runs the FastAPI app in-process against local stand-ins.
+
+Redis is replaced by fakeredis and the database defaults to a throwaway
+SQLite file served by aiosqlite. A Postgres DSN can be passed instead; its
+tables are created before the run and dropped afterwards, so only point it
+at a database that exists for the benchmark.
+"""
+
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+BENCHMARK_ENV = {
+    "LOCAL__DB__HOST": "localhost",
+    "LOCAL__DB__PORT": "5432",
+    "LOCAL__DB__NAME": "benchmark",
+    "LOCAL__DB__USER": "benchmark",
+    "LOCAL__DB__PASSWORD": "benchmark",
+    "LOCAL__JWT__SECRET_KEY": "benchmark-only-secret-key-0123456789",
+    "LOCAL__REDIS__URL": "localhost",
+    # Every benchmark request comes from one client address.
+    "LOCAL__RATE_LIMIT__ENABLED": "false",
+}
+
+
+def configure_environment(database_url: str) -> None:
+    """
+    Must run before anything under `src` is imported, config is read at
+    import time.
+    """
+    os.environ["ENVIRONMENT"] = "local"
+    os.environ["LOCAL__DB__DSN"] = database_url
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+def install_fake_redis() -> None:
+    """
+    Swap the shared Redis clients for fakeredis before the services that
+    hold on to them are imported.
+    """
+    import fakeredis
+    from fakeredis.aioredis import FakeConnection
+    from redis.asyncio import ConnectionPool
+
+    from src.db import redis as redis_module
+
+    server = fakeredis.FakeServer()
+
+    def client(**kwargs) -> redis_module.InstrumentedRedis:
+        pool = ConnectionPool(connection_class=FakeConnection, server=server, **kwargs)
+        return redis_module.InstrumentedRedis(connection_pool=pool)
+
+    redis = client(decode_responses=True)
+    binary_redis = client()
+    redis_module.get_redis = lambda: redis
+    redis_module.get_binary_redis = lambda: binary_redis
+
+
+def _tune_sqlite(engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=30000")
+        cursor.close()
+
+
+@asynccontextmanager
+async def benchmark_client(
+    database_url: str | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    with tempfile.TemporaryDirectory(prefix="fastapi-bench-") as tmp:
+        if database_url is None:
+            database_url = f"sqlite+aiosqlite:///{Path(tmp) / 'benchmark.db'}"
+        configure_environment(database_url)
+        install_fake_redis()
+
+        from main import app
+        from src.db.models import Base
+        from src.db.session import dispose_engine, get_engine
+
+        engine = get_engine()
+
+        if engine.dialect.name == "sqlite":
+            _tune_sqlite(engine)
+
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(
+                    transport=transport,
+                    base_url="http://benchmark",
+                    timeout=None,
+                ) as client:
+                    yield client
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.drop_all)
+            await dispose_engine()
@@ -0,0 +1,92 @@
+"""
+Import-time budget for the app.
+
+Usage (from the backend directory):
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 1000 --top 25
+
+Imports `main` in fresh interpreters under `python -X importtime`, prints
+the slowest modules of the fastest run and exits with status 1 when the
+import exceeds the budget or pulls in a module that should load lazily.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.harness import BENCHMARK_ENV
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# Heavy modules that are only needed once a request uses them.
+LAZY_MODULES = ("eth_account", "passlib", "asyncpg")
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure() -> list[ImportRecord]:
+    env = {**BENCHMARK_ENV, **os.environ, "ENVIRONMENT": "local"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in result.stderr.splitlines():
+        if match := LINE.match(line):
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2)
+            )
+    return records
+
+
+def total_ms(records: list[ImportRecord]) -> float:
+    return next(r.cumulative_us for r in records if r.module == "main") / 1000
+
+
+def main(args: argparse.Namespace) -> int:
+    runs = [measure() for _ in range(args.runs)]
+    records = min(runs, key=total_ms)
+    total = total_ms(records)
+
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[
+        : args.top
+    ]:
+        print(
+            f"{record.cumulative_us / 1000:>14.1f}{record.self_us / 1000:>10.1f}  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+    print(f"\nimport main: {total:.0f} ms (fastest of {args.runs})")
+
+    exit_code = 0
+    imported = {record.module.split(".")[0] for record in records}
+    if eager := [module for module in LAZY_MODULES if module in imported]:
+        print(f"imported eagerly: {', '.join(eager)}", file=sys.stderr)
+        exit_code = 1
+    if total > args.budget_ms:
+        print(f"over budget: {total:.0f} ms > {args.budget_ms} ms", file=sys.stderr)
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure app import time")
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import math
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+
+from benchmarks.scenarios import Scenario
+
+# Metrics compared against the baseline and whether higher is better.
+COMPARED_METRICS = {
+    "throughput": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    requests: int
+    errors: int
+    duration_s: float
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+) -> ScenarioResult:
+    calls = iter(await scenario.prepare(client, requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        for call in calls:
+            start = time.perf_counter()
+            try:
+                response = await client.request(call.method, call.url, **call.kwargs)
+                failed = response.status_code != scenario.expected_status
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+
+    latencies.sort()
+    return ScenarioResult(
+        name=scenario.name,
+        requests=len(latencies),
+        errors=errors,
+        duration_s=round(duration, 4),
+        throughput=round(len(latencies) / duration, 2) if duration else 0.0,
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 0.95) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+    )
+
+
+def load_baseline(path: Path) -> dict | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(
+    path: Path,
+    results: list[ScenarioResult],
+    requests: int,
+    concurrency: int,
+) -> None:
+    baseline = load_baseline(path) or {}
+    baseline.update({"requests": requests, "concurrency": concurrency})
+    scenarios = baseline.setdefault("scenarios", {})
+    for result in results:
+        scenarios[result.name] = asdict(result)
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+def compare(
+    results: list[ScenarioResult],
+    baseline: dict,
+    tolerance: float,
+) -> list[str]:
+    """
+    Returns a line per metric that regressed by more than `tolerance`.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get("scenarios", {}).get(result.name)
+        if reference is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            current, previous = getattr(result, metric), reference[metric]
+            if not previous:
+                continue
+            change = (current - previous) / previous
+            if (higher_is_better and change < -tolerance) or (
+                not higher_is_better and change > tolerance
+            ):
+                regressions.append(
+                    f"{result.name}.{metric}: {previous} -> {current} "
+                    f"({change:+.1%})"
+                )
+    return regressions
+
+
+def _change(current: float, previous: float) -> str:
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous:+.1%}"
+
+
+def format_results(results: list[ScenarioResult], baseline: dict | None) -> str:
+    """
+    The results table; with a baseline every scenario also gets the
+    baseline's row and the relative change of each compared metric.
+    """
+    header = (
+        f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.name:<16}{result.requests:>10}{result.errors:>8}"
+            f"{result.throughput:>10.1f}{result.p50_ms:>10.2f}"
+            f"{result.p95_ms:>10.2f}{result.p99_ms:>10.2f}"
+        )
+        reference = (baseline or {}).get("scenarios", {}).get(result.name)
+        if reference is not None:
+            lines.append(
+                f"{'  baseline':<16}{reference['requests']:>10}"
+                f"{reference['errors']:>8}{reference['throughput']:>10.1f}"
+                f"{reference['p50_ms']:>10.2f}{reference['p95_ms']:>10.2f}"
+                f"{reference['p99_ms']:>10.2f}"
+            )
+            changes = [
+                _change(getattr(result, metric), reference[metric])
+                for metric in COMPARED_METRICS
+            ]
+            lines.append(
+                f"{'  change':<16}{'':>18}"
+                + "".join(f"{change:>10}" for change in changes)
+            )
+    return "\n".join(lines)
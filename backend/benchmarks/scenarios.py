@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+# Logins and /users/me reuse a small pool of accounts so setup stays cheap.
+ACCOUNT_POOL_SIZE = 20
+
+
+@dataclass(frozen=True)
+class Call:
+    method: str
+    url: str
+    kwargs: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    prepare: Callable[[httpx.AsyncClient, int], Awaitable[list[Call]]]
+    expected_status: int = 200
+
+
+def _user(prefix: str, index: int) -> dict:
+    return {
+        "username": f"{prefix}-{index}",
+        "email": f"{prefix}-{index}@example.com",
+        "password": f"{prefix}-password-{index}",
+    }
+
+
+async def _register(client: httpx.AsyncClient, user: dict) -> dict:
+    response = await client.post("/api/auth/jwt/register", json=user)
+    response.raise_for_status()
+    return response.json()
+
+
+def _wallet(index: int):
+    from eth_account import Account
+
+    return Account.from_key(hashlib.sha256(f"bench-wallet-{index}".encode()).digest())
+
+
+async def prepare_register(client: httpx.AsyncClient, count: int) -> list[Call]:
+    return [
+        Call("POST", "/api/auth/jwt/register", {"json": _user("register", i)})
+        for i in range(count)
+    ]
+
+
+async def prepare_jwt_login(client: httpx.AsyncClient, count: int) -> list[Call]:
+    users = [_user("login", i) for i in range(min(count, ACCOUNT_POOL_SIZE))]
+    await asyncio.gather(*(_register(client, user) for user in users))
+    return [
+        Call(
+            "POST",
+            "/api/auth/jwt/login",
+            {
+                "json": {
+                    "identifier": users[i % len(users)]["email"],
+                    "password": users[i % len(users)]["password"],
+                }
+            },
+        )
+        for i in range(count)
+    ]
+
+
+async def prepare_jwt_refresh(client: httpx.AsyncClient, count: int) -> list[Call]:
+    """
+    Refresh tokens are single use, so each call gets its own pair minted
+    in-process for one registered user.
+    """
+    from src.services.jwt_service import create_token_pair
+    from src.services.principals import Principal
+
+    user = _user("refresh", 0)
+    tokens = await _register(client, user)
+    response = await client.get(
+        "/api/users/me",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    response.raise_for_status()
+    principal = Principal(user_type="default", **response.json())
+    return [
+        Call(
+            "POST",
+            "/api/auth/jwt/refresh",
+            {"json": {"refresh_token": create_token_pair(principal).refresh_token}},
+        )
+        for _ in range(count)
+    ]
+
+
+async def prepare_web3_get_nonce(client: httpx.AsyncClient, count: int) -> list[Call]:
+    return [
+        Call("POST", "/api/auth/web3/get_nonce", {"json": {"wallet": f"0x{i:040x}"}})
+        for i in range(count)
+    ]
+
+
+async def prepare_web3_login(client: httpx.AsyncClient, count: int) -> list[Call]:
+    """
+    Nonces are single use, so every login gets its own wallet with a nonce
+    issued and signed before the timed run starts.
+    """
+    from eth_account.messages import encode_defunct
+
+    calls = []
+    for i in range(count):
+        wallet = _wallet(i)
+        response = await client.post(
+            "/api/auth/web3/get_nonce",
+            json={"wallet": wallet.address},
+        )
+        response.raise_for_status()
+        nonce = response.json()["nonce"]
+        signature = wallet.sign_message(encode_defunct(text=nonce)).signature
+        calls.append(
+            Call(
+                "POST",
+                "/api/auth/web3/login",
+                {
+                    "json": {
+                        "nonce": nonce,
+                        "address": wallet.address,
+                        "signature": signature.to_0x_hex(),
+                    }
+                },
+            )
+        )
+    return calls
+
+
+async def prepare_users_me(client: httpx.AsyncClient, count: int) -> list[Call]:
+    users = [_user("me", i) for i in range(min(count, ACCOUNT_POOL_SIZE))]
+    tokens = await asyncio.gather(*(_register(client, user) for user in users))
+    return [
+        Call(
+            "GET",
+            "/api/users/me",
+            {
+                "headers": {
+                    "Authorization": f"Bearer {tokens[i % len(tokens)]['access_token']}"
+                }
+            },
+        )
+        for i in range(count)
+    ]
+
+
+async def prepare_with_cache(client: httpx.AsyncClient, count: int) -> list[Call]:
+    # Prime the cache so the run measures hits, not the 2s computation.
+    response = await client.get("/api/tests/with-cache")
+    response.raise_for_status()
+    return [Call("GET", "/api/tests/with-cache") for _ in range(count)]
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("jwt_register", prepare_register),
+        Scenario("jwt_login", prepare_jwt_login),
+        Scenario("jwt_refresh", prepare_jwt_refresh),
+        Scenario("web3_get_nonce", prepare_web3_get_nonce),
+        Scenario("web3_login", prepare_web3_login),
+        Scenario("users_me", prepare_users_me),
+        Scenario("with_cache", prepare_with_cache),
+    )
+}
@@ -0,0 +1,44 @@
+"""
+Production server settings.
+
+    gunicorn main:app -c gunicorn.conf.py
+
+One uvicorn worker per available CPU unless `server.workers` is set. The
+app is imported once in the master and forked into warm workers; workers
+are recycled after `max_requests` (with jitter so they do not restart
+together) and get `graceful_timeout` seconds to drain on SIGTERM.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from src.core.config import get_env
+from src.core.server import available_cpus
+
+server_config = get_env().server
+
+bind = server_config.bind
+workers = server_config.workers or available_cpus()
+worker_class = "src.core.server.ProductionWorker"
+preload_app = server_config.preload
+max_requests = server_config.max_requests
+max_requests_jitter = server_config.max_requests_jitter
+timeout = server_config.timeout
+graceful_timeout = server_config.graceful_timeout
+keepalive = server_config.keepalive
+# Set to the load balancer / nginx addresses so client IPs (used for rate
+# limiting) come from X-Forwarded-For.
+forwarded_allow_ips = server_config.forwarded_allow_ips
+
+# Metric files from a previous run have to go before the app is preloaded.
+if multiproc_dir := os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    Path(multiproc_dir).mkdir(parents=True, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
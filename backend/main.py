@@ -1,14 +1,61 @@
 import asyncio
+from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.requests import Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response
 
 from src.api import api_router
+from src.routes import health_router, well_known_router
+from src.core.config import get_env, refresh_secrets
+from src.core.responses import get_response_class
+from src.core.metrics import MetricsMiddleware, monitor_event_loop_lag, render_metrics
+from src.db.session import dispose_engine
+from src.services.hashing import password_hasher
+from src.services.auth import require_metrics_access
+from src.services.revocation import revocation_list
+from src.services.warmup import warm_up
+from src.services.web3_auth import signature_recoverer
 
-app = FastAPI(title="FastAPI Backend + AWS Deploy")
+config = get_env()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.hashing.calibrate_on_startup:
+        await password_hasher.calibrate(
+            config.hashing.calibration_target_ms,
+            config.hashing.min_bcrypt_rounds,
+            config.hashing.max_bcrypt_rounds,
+        )
+    revocation_listener = asyncio.create_task(revocation_list.listen())
+    lag_monitor = asyncio.create_task(monitor_event_loop_lag())
+    secrets_refresher = asyncio.create_task(refresh_secrets())
+    # Under gunicorn a worker only accepts connections once startup is
+    # done, so waiting here keeps cold workers out of rotation.
+    warm_up_task = asyncio.create_task(warm_up.run())
+    await asyncio.wait({warm_up_task}, timeout=config.warmup.startup_wait_seconds)
+    yield
+    warm_up.ready = False
+    warm_up_task.cancel()
+    secrets_refresher.cancel()
+    lag_monitor.cancel()
+    revocation_listener.cancel()
+    await dispose_engine()
+    password_hasher.shutdown()
+    signature_recoverer.shutdown()
+
+
+app = FastAPI(
+    title="FastAPI Backend + AWS Deploy",
+    lifespan=lifespan,
+    default_response_class=get_response_class(),
+)
+app.add_middleware(MetricsMiddleware)
 app.include_router(api_router)
+app.include_router(well_known_router)
+app.include_router(health_router)
 
 
 @app.route("/")
@@ -19,6 +66,16 @@ async def redirect_to_docs(request: Request):
     return RedirectResponse("/docs")
 
 
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_access)],
+)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+
 @app.get("/load_test")
 async def load_test(request: Request):
     await asyncio.sleep(2)
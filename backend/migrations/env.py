@@ -2,7 +2,8 @@ import asyncio
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import pool
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import pool, text
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
@@ -31,6 +32,19 @@ target_metadata = Base.metadata
 # ... etc.
 config.set_main_option("sqlalchemy.url", settings.db.url)
 
+# -x options, see migrations/helpers.py
+x_args = context.get_x_argument(as_dictionary=True)
+dry_run = x_args.get("dry_run", "false").lower() in ("1", "true", "yes")
+lock_timeout = x_args.get("lock_timeout", "5s")
+statement_timeout = x_args.get("statement_timeout", "60s")
+config.attributes["dry_run"] = dry_run
+config.attributes["statement_timeout"] = statement_timeout
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    # Bookkeeping table of migrations.helpers.batched_update
+    return not (type_ == "table" and name == "migration_checkpoints")
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -50,6 +64,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -57,7 +72,29 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # Session settings, so they outlive the per-migration transactions.
+    connection.execute(text(f"SET lock_timeout = '{lock_timeout}'"))
+    connection.execute(text(f"SET statement_timeout = '{statement_timeout}'"))
+    connection.commit()
+
+    if dry_run:
+        # Write the SQL out instead of running it; helpers still read row
+        # estimates through the real connection.
+        config.attributes["connection"] = connection
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            as_sql=True,
+            starting_rev=MigrationContext.configure(connection).get_current_revision(),
+        )
+    else:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            transaction_per_migration=True,
+        )
 
     with context.begin_transaction():
         context.run_migrations()
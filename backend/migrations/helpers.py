@@ -0,0 +1,243 @@
+"""
+Helpers for migrations that run against populated tables.
+
+Anything that rewrites rows or builds an index on a live table should go
+through these instead of plain ``op`` calls:
+
+- ``create_index_concurrently`` / ``drop_index_concurrently`` build and
+  drop indexes outside the migration transaction, without blocking writes.
+- ``batched_update`` rewrites rows in short, throttled, autocommitted
+  batches and keeps a checkpoint, so an interrupted run resumes where it
+  stopped. Its SET clause must be idempotent.
+- ``add_check_constraint`` adds a constraint NOT VALID and validates it
+  separately, which doesn't block writes either.
+
+env.py sets ``lock_timeout`` and ``statement_timeout`` on the migration
+connection (``-x lock_timeout=5s -x statement_timeout=60s``), so DDL that
+cannot get its lock fails fast instead of queueing every query behind it.
+
+``alembic -x dry_run=true upgrade head`` prints the SQL instead of running
+it, with estimated row counts for the batched work.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+CHECKPOINT_TABLE = "migration_checkpoints"
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_PAUSE_SECONDS = 0.05
+
+
+def is_dry_run() -> bool:
+    return op.get_context().config.attributes.get("dry_run", False)
+
+
+def connection() -> Connection:
+    """
+    The real database connection, also in dry runs where ``op.get_bind()``
+    only writes SQL out. Use it for reads only.
+    """
+    return op.get_context().config.attributes.get("connection") or op.get_bind()
+
+
+def report(message: str) -> None:
+    if is_dry_run():
+        op.get_context().impl.static_output(f"-- {message}")
+    else:
+        logger.info(message)
+
+
+def estimate_rows(table: str, where: str | None = None) -> int:
+    """
+    Planner estimate of the rows in ``table`` matching ``where``, or of all
+    its rows when ``where`` can't be planned yet (e.g. in a dry run it uses
+    a column the same migration adds).
+    """
+    bind = connection()
+    if where is not None:
+        try:
+            with bind.begin_nested():
+                plan = bind.scalar(
+                    sa.text(
+                        f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table} WHERE {where}"
+                    )
+                )
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except sa.exc.DBAPIError:
+            pass
+    rows = bind.scalar(
+        sa.text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    )
+    return max(int(rows or 0), 0)
+
+
+@contextmanager
+def outside_transaction() -> Iterator[None]:
+    """
+    Commits the migration so far and runs the block in autocommit mode.
+    """
+    with op.get_context().autocommit_block():
+        yield
+
+
+@contextmanager
+def without_statement_timeout() -> Iterator[None]:
+    op.execute("SET statement_timeout = 0")
+    try:
+        yield
+    finally:
+        timeout = op.get_context().config.attributes.get("statement_timeout", "0")
+        op.execute(f"SET statement_timeout = '{timeout}'")
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: list[str],
+    unique: bool = False,
+    where: str | None = None,
+) -> None:
+    report(f"index {name}: about {estimate_rows(table)} rows in {table}")
+    with outside_transaction(), without_statement_timeout():
+        # A failed concurrent build leaves an invalid index behind.
+        if connection().scalar(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index "
+                "WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        ):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+        op.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY "
+            f"IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+            + (f" WHERE {where}" if where else "")
+        )
+
+
+def drop_index_concurrently(name: str) -> None:
+    with outside_transaction():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def add_check_constraint(name: str, table: str, condition: str) -> None:
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID"
+    )
+    with outside_transaction(), without_statement_timeout():
+        op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def _key_type(table: str, key: str) -> str:
+    return connection().scalar(
+        sa.text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = to_regclass(:table) AND attname = :key"
+        ),
+        {"table": table, "key": key},
+    )
+
+
+def batched_update(
+    name: str,
+    table: str,
+    set_clause: str,
+    where: str,
+    key: str = "id",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pause_seconds: float = DEFAULT_PAUSE_SECONDS,
+) -> int:
+    """
+    Runs ``UPDATE table SET set_clause WHERE where`` in batches walked in
+    ``key`` order, committing each batch and pausing ``pause_seconds``
+    between them. Progress is checkpointed under ``name``; a rerun continues
+    after the last finished batch.
+
+    Rows inserted behind the cursor while it runs are not visited, so
+    finish with a catch-up pass under lock if the app may still write them.
+    Returns the number of rows updated.
+    """
+    if is_dry_run():
+        rows = estimate_rows(table, where)
+        report(
+            f"{name}: about {rows} rows in {table} to update "
+            f"in batches of {batch_size}"
+        )
+        return 0
+
+    total = 0
+    with outside_transaction():
+        bind = connection()
+        bind.execute(
+            sa.text(
+                f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+                "name text PRIMARY KEY, last_key text NOT NULL, "
+                "rows_done bigint NOT NULL, "
+                "updated_at timestamptz NOT NULL DEFAULT now())"
+            )
+        )
+        checkpoint = bind.execute(
+            sa.text(
+                f"SELECT last_key, rows_done FROM {CHECKPOINT_TABLE} "
+                "WHERE name = :name"
+            ),
+            {"name": name},
+        ).first()
+        last_key, total = checkpoint if checkpoint else (None, 0)
+        if checkpoint:
+            report(f"{name}: resuming after {last_key}, {total} rows done")
+
+        key_type = _key_type(table, key)
+        after = f"{key} > CAST(CAST(:after AS text) AS {key_type}) AND "
+        # One statement per batch: pick the next keys, update them and
+        # return the last key and row count for the checkpoint.
+        batch = (
+            f"WITH batch AS (SELECT {key} FROM {table} WHERE {{after}}({where}) "
+            f"ORDER BY {key} LIMIT :limit), "
+            f"updated AS (UPDATE {table} SET {set_clause} FROM batch "
+            f"WHERE {table}.{key} = batch.{key} RETURNING 1) "
+            f"SELECT (SELECT {key}::text FROM batch ORDER BY {key} DESC LIMIT 1), "
+            "(SELECT count(*) FROM updated)"
+        )
+        first = sa.text(batch.replace("{after}", ""))
+        following = sa.text(batch.replace("{after}", after))
+        save = sa.text(
+            f"INSERT INTO {CHECKPOINT_TABLE} (name, last_key, rows_done) "
+            "VALUES (:name, :last_key, :rows_done) "
+            "ON CONFLICT (name) DO UPDATE SET last_key = excluded.last_key, "
+            "rows_done = excluded.rows_done, updated_at = now()"
+        )
+        while True:
+            if last_key is None:
+                result = bind.execute(first, {"limit": batch_size})
+            else:
+                result = bind.execute(
+                    following,
+                    {"after": last_key, "limit": batch_size},
+                )
+            batch_last_key, updated = result.one()
+            if batch_last_key is None:
+                break
+            last_key = batch_last_key
+            total += updated
+            bind.execute(
+                save,
+                {"name": name, "last_key": last_key, "rows_done": total},
+            )
+            report(f"{name}: {total} rows updated")
+            time.sleep(pause_seconds)
+
+        bind.execute(
+            sa.text(f"DELETE FROM {CHECKPOINT_TABLE} WHERE name = :name"),
+            {"name": name},
+        )
+    return total
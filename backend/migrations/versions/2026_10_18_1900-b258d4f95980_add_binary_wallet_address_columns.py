@@ -0,0 +1,129 @@
+"""add binary wallet address columns
+
+Expand step of moving wallet addresses from text to their 20 raw bytes.
+The app reads and writes wallet_address_bytes from this revision on; a
+trigger keeps the old text column in sync both ways, so the previous
+release keeps working until it is stopped. Dropping wallet_address and
+the trigger is left to a later revision, shipped once no instance of the
+previous release is running.
+
+Revision ID: b258d4f95980
+Revises: a695a267d572
+Create Date: 2026-10-18 19:00:12.418305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import (
+    add_check_constraint,
+    batched_update,
+    connection,
+    create_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "b258d4f95980"
+down_revision: Union[str, Sequence[str], None] = "a695a267d572"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("users", "web3_users")
+COPY_WALLET = "wallet_address_bytes = decode(substr(wallet_address, 3), 'hex')"
+NOT_COPIED = "wallet_address IS NOT NULL AND wallet_address_bytes IS NULL"
+
+# Whichever column a writer set is copied to the other one. Text written
+# by the previous release keeps its casing.
+SYNC_FUNCTION = """
+CREATE FUNCTION sync_wallet_address_bytes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+        AND NEW.wallet_address IS DISTINCT FROM OLD.wallet_address THEN
+        NEW.wallet_address_bytes := decode(substr(NEW.wallet_address, 3), 'hex');
+    ELSIF NEW.wallet_address_bytes IS NULL THEN
+        NEW.wallet_address_bytes := decode(substr(NEW.wallet_address, 3), 'hex');
+    ELSIF NEW.wallet_address_bytes IS DISTINCT FROM
+        decode(substr(NEW.wallet_address, 3), 'hex') THEN
+        NEW.wallet_address := '0x' || encode(NEW.wallet_address_bytes, 'hex');
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def _check_existing(table: str) -> None:
+    bind = connection()
+    invalid = bind.scalar(
+        sa.text(
+            f"SELECT count(*) FROM {table} "
+            "WHERE wallet_address IS NOT NULL "
+            "AND wallet_address !~ '^0x[0-9a-fA-F]{40}$'"
+        )
+    )
+    duplicated = bind.scalar(
+        sa.text(
+            f"SELECT count(*) FROM (SELECT lower(wallet_address) FROM {table} "
+            "WHERE wallet_address IS NOT NULL GROUP BY 1 HAVING count(*) > 1) d"
+        )
+    )
+    if invalid or duplicated:
+        raise RuntimeError(
+            f"{table} has {invalid} malformed and {duplicated} case-duplicated "
+            "wallet addresses, fix them before upgrading"
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(SYNC_FUNCTION)
+    for table in TABLES:
+        _check_existing(table)
+        op.add_column(
+            table,
+            sa.Column("wallet_address_bytes", sa.LargeBinary(), nullable=True),
+        )
+        # Before the backfill, so rows written meanwhile are covered.
+        op.execute(
+            f"CREATE TRIGGER {table}_sync_wallet_address "
+            f"BEFORE INSERT OR UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION sync_wallet_address_bytes()"
+        )
+
+    for table in TABLES:
+        batched_update(f"{table}_wallet_address_bytes", table, COPY_WALLET, NOT_COPIED)
+        create_index_concurrently(
+            f"{table}_wallet_address_bytes_key",
+            table,
+            ["wallet_address_bytes"],
+            unique=True,
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_wallet_address_bytes_key "
+            f"UNIQUE USING INDEX {table}_wallet_address_bytes_key"
+        )
+        add_check_constraint(
+            f"{table}_wallet_address_bytes_length",
+            table,
+            "octet_length(wallet_address_bytes) = 20",
+        )
+
+    # The validated check lets SET NOT NULL skip the table scan.
+    add_check_constraint(
+        "web3_users_wallet_address_bytes_not_null",
+        "web3_users",
+        "wallet_address_bytes IS NOT NULL",
+    )
+    op.alter_column("web3_users", "wallet_address_bytes", nullable=False)
+    op.drop_constraint("web3_users_wallet_address_bytes_not_null", "web3_users")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER {table}_sync_wallet_address ON {table}")
+        op.drop_column(table, "wallet_address_bytes")
+    op.execute("DROP FUNCTION sync_wallet_address_bytes()")
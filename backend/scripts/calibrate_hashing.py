@@ -0,0 +1,41 @@
+"""
+Measure bcrypt on this machine and print the cost that fits a time budget.
+
+Usage (from the backend directory):
+    python scripts/calibrate_hashing.py
+    python scripts/calibrate_hashing.py --target-ms 300
+
+Run it on the instance type you deploy to and set the result as
+`hashing.bcrypt_rounds`, or set `hashing.calibrate_on_startup` to do the
+same measurement in every worker at boot.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.config import get_env  # noqa: E402
+from src.services.hashing import calibrate_bcrypt_rounds  # noqa: E402
+
+
+def main(args: argparse.Namespace) -> None:
+    hashing = get_env().hashing
+    target_ms = args.target_ms or hashing.calibration_target_ms
+    rounds, seconds = calibrate_bcrypt_rounds(
+        target_ms,
+        args.min_rounds or hashing.min_bcrypt_rounds,
+        args.max_rounds or hashing.max_bcrypt_rounds,
+    )
+    print(
+        f"bcrypt rounds: {rounds} ({seconds * 1000:.0f} ms, target {target_ms:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float)
+    parser.add_argument("--min-rounds", type=int)
+    parser.add_argument("--max-rounds", type=int)
+    main(parser.parse_args())
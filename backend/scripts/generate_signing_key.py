@@ -0,0 +1,51 @@
+"""
+Generate a private key for signing JWTs.
+
+Usage (from the backend directory):
+    python scripts/generate_signing_key.py --dir keys
+    python scripts/generate_signing_key.py --dir keys --alg RS256 --kid 2025-07
+
+The key is written to `<dir>/<kid>.pem`; point `jwt.keys_dir` at the
+directory. The newest kid signs once its file is older than
+`jwt.key_publish_delay_seconds` (the JWKS max-age by default), unless
+`jwt.active_kid` says otherwise. Copy keys in without preserving mtimes.
+"""
+
+import argparse
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+GENERATORS = {
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+    "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=3072),
+}
+
+
+def main(args: argparse.Namespace) -> None:
+    kid = args.kid or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    path = args.dir / f"{kid}.pem"
+    if path.exists():
+        raise SystemExit(f"{path} already exists")
+    pem = GENERATORS[args.alg]().private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    args.dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(pem)
+    print(f"Wrote {args.alg} key {kid} to {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", type=Path, required=True)
+    parser.add_argument("--alg", choices=sorted(GENERATORS), default="ES256")
+    parser.add_argument("--kid", help="key id, defaults to the current UTC time")
+    main(parser.parse_args())
@@ -0,0 +1,66 @@
+"""
+Bulk import users from a CSV or JSONL file.
+
+Usage (from the backend directory):
+    python scripts/import_users.py users.jsonl
+    python scripts/import_users.py wallets.csv --table web3_users
+
+User rows need `username`, `email` and either `password` or a bcrypt
+`hashed_password`; web3 rows need `wallet_address`.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.core.config import get_env  # noqa: E402
+from src.db.session import dispose_engine, get_engine  # noqa: E402
+from src.services.user_import import UserImporter, parse_rows  # noqa: E402
+
+
+async def read_lines(path: Path):
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+async def main(args: argparse.Namespace) -> None:
+    fmt = args.format or ("csv" if args.path.suffix == ".csv" else "jsonl")
+    workers = args.workers or get_env().hashing.import_workers
+    report = None
+    try:
+        async with UserImporter(
+            get_engine(),
+            table=args.table,
+            chunk_size=args.chunk_size,
+            workers=workers,
+        ) as importer:
+            async for report in importer.run(parse_rows(read_lines(args.path), fmt)):
+                progress = report.progress()
+                print(
+                    f"\rprocessed={progress['processed']} "
+                    f"inserted={progress['inserted']} "
+                    f"conflicts={progress['conflicts']} "
+                    f"errors={progress['errors']}",
+                    end="",
+                    file=sys.stderr,
+                )
+    finally:
+        await dispose_engine()
+    print(file=sys.stderr)
+    if report is not None:
+        print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import users")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--table", choices=["users", "web3_users"], default="users")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int)
+    asyncio.run(main(parser.parse_args()))
@@ -1,13 +1,31 @@
 import os
+from collections.abc import Callable
+from functools import lru_cache
 
 from dotenv import load_dotenv
+from pydantic import BaseModel
 
 from .dev import get_dev_config
 from .local import get_local_config
+from .secrets import SecretsProvider, SecretsSettings
 
+_reload_callbacks: list[Callable[[], None]] = []
 
+
+@lru_cache
+def get_secrets_provider() -> SecretsProvider | None:
+    settings = SecretsSettings()
+    if not settings.secret_names:
+        return None
+    return SecretsProvider.from_settings(settings)
+
+
+@lru_cache
 def get_env():
     load_dotenv()
+    if (provider := get_secrets_provider()) is not None:
+        provider.load()
+        provider.on_change(reload_env)
 
     env = os.environ.get("ENVIRONMENT", "local")
 
@@ -18,3 +36,42 @@ def get_env():
             return get_dev_config()
         case _:
             raise ValueError(f"Unsupported ENVIRONMENT: {env}")
+
+
+def _update_in_place(target: BaseModel, source: BaseModel) -> None:
+    for name in type(source).model_fields:
+        current, new = getattr(target, name), getattr(source, name)
+        if isinstance(current, BaseModel) and type(current) is type(new):
+            _update_in_place(current, new)
+        elif current != new:
+            setattr(target, name, new)
+
+
+def on_reload(callback: Callable[[], None]) -> Callable[[], None]:
+    """
+    Registers `callback` to run after the config changed at runtime.
+    """
+    _reload_callbacks.append(callback)
+    return callback
+
+
+def reload_env() -> None:
+    """
+    Rebuilds the config from the environment and copies it into the one
+    every module already holds, so refreshed secrets apply without
+    restarting workers.
+    """
+    config = get_env()
+    # Built in full first: a value that doesn't validate changes nothing.
+    reloaded = type(config)()
+    _update_in_place(config, reloaded)
+    for callback in _reload_callbacks:
+        callback()
+
+
+async def refresh_secrets() -> None:
+    """
+    Keeps secrets and config up to date. Runs until cancelled.
+    """
+    if (provider := get_secrets_provider()) is not None:
+        await provider.refresh_forever()
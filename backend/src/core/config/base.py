@@ -1,16 +1,27 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from pydantic import BaseModel, Field
 
 
 class JWT(BaseModel):
-    secret_key: str
+    secret_key: str | None = None
     algorithm: str = "HS256"
+    keys_dir: str | None = None
+    active_kid: str | None = None
+    keys_reload_interval_seconds: float = 60
+    jwks_max_age_seconds: int = 300
+    # How long a new key is only published before it may sign, so services
+    # caching the JWKS know it first. Defaults to jwks_max_age_seconds.
+    key_publish_delay_seconds: float | None = None
     access_token_expire_minutes: float = 60
     refresh_token_expire_minutes: float = 60
+    cache_size: int = 10_000
 
 
 class Redis(BaseModel):
     url: str
+    port: int = 6379
 
 
 class Database(BaseModel):
@@ -19,14 +30,134 @@ class Database(BaseModel):
     name: str
     user: str
     password: str = Field(..., exclude=True)
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    dsn: str | None = Field(None, exclude=True)
 
     @property
     def url(self) -> str:
+        if self.dsn:
+            return self.dsn
         return f"postgresql+asyncpg://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
 
 
+class Hashing(BaseModel):
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int | None = None
+    max_pending: int = 64
+    import_workers: int | None = None
+    # Fixed bcrypt cost; when unset, passlib's default unless calibrated.
+    bcrypt_rounds: int | None = None
+    calibrate_on_startup: bool = False
+    calibration_target_ms: float = 250
+    min_bcrypt_rounds: int = 10
+    max_bcrypt_rounds: int = 15
+
+
+class Web3(BaseModel):
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int | None = None
+    recovery_mode: Literal["executor", "batch"] = "executor"
+    batch_window_ms: float = 2
+    max_batch_size: int = 64
+    nonce_store: Literal["redis", "memory"] = "redis"
+    nonce_ttl_seconds: int = 300
+
+
+class PrincipalCache(BaseModel):
+    enabled: bool = True
+    claims_only: bool = False
+    l1_ttl_seconds: float = 30
+    l1_max_size: int = 10_000
+    l2_ttl_seconds: int = 300
+
+
+class ResponseCache(BaseModel):
+    serializer: Literal["json", "orjson", "msgpack"] = "orjson"
+    l1_ttl_seconds: float = 5
+    l1_max_size: int = 1024
+    lock_timeout_ms: int = 10_000
+
+
+class Loaders(BaseModel):
+    batch_window_ms: float = 2
+    max_batch_size: int = 100
+
+
+class Warmup(BaseModel):
+    enabled: bool = True
+    # Defaults to db.pool_size
+    db_connections: int | None = None
+    step_timeout_seconds: float = 10
+    retry_interval_seconds: float = 2
+    # How long startup waits for warm-up before serving anyway (not ready).
+    # Keep it below server.timeout.
+    startup_wait_seconds: float = 30
+
+
+class Revocation(BaseModel):
+    enabled: bool = True
+    channel: str = "revocation:invalidate"
+    bloom_capacity: int = 100_000
+    bloom_error_rate: float = 0.001
+    rebuild_interval_seconds: float = 300
+
+
+class RateLimit(BaseModel):
+    enabled: bool = True
+    ip_limit: int = 30
+    ip_period_seconds: float = 60
+    identifier_limit: int = 10
+    identifier_period_seconds: float = 300
+    local_max_keys: int = 10_000
+
+
+class Admin(BaseModel):
+    api_key: str | None = Field(None, exclude=True)
+
+
+class Metrics(BaseModel):
+    # Bearer token for scraping /metrics; the admin key is accepted too.
+    token: str | None = Field(None, exclude=True)
+
+
+class Api(BaseModel):
+    response_class: Literal["json", "orjson", "msgspec"] = "orjson"
+
+
+class Server(BaseModel):
+    bind: str = "0.0.0.0:8000"
+    workers: int | None = None
+    preload: bool = True
+    max_requests: int = 10_000
+    max_requests_jitter: int = 1_000
+    timeout: int = 60
+    graceful_timeout: int = 25
+    keepalive: int = 5
+    # Required behind a proxy: its addresses or CIDRs, comma separated.
+    # Client IPs, and so per-IP rate limits, come from X-Forwarded-For only
+    # for these; behind an unlisted proxy all clients share one limit.
+    forwarded_allow_ips: str = "127.0.0.1"
+
+
 class BaseConfig(BaseSettings):
     environment: str = "local"
     jwt: JWT
     db: Database
     redis: Redis
+    hashing: Hashing = Hashing()
+    web3: Web3 = Web3()
+    principal_cache: PrincipalCache = PrincipalCache()
+    response_cache: ResponseCache = ResponseCache()
+    loaders: Loaders = Loaders()
+    warmup: Warmup = Warmup()
+    revocation: Revocation = Revocation()
+    rate_limit: RateLimit = RateLimit()
+    admin: Admin = Admin()
+    metrics: Metrics = Metrics()
+    api: Api = Api()
+    server: Server = Server()
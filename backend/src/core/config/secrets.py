@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Literal, Protocol
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from src.core.metrics import SECRETS_REFRESHES
+
+logger = logging.getLogger(__name__)
+
+
+class SecretsSettings(BaseSettings):
+    """
+    Where secrets come from. Read from `SECRETS_*` variables because it is
+    needed before the rest of the config can be built.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="SECRETS_")
+
+    backend: Literal["aws", "file"] = "aws"
+    # Comma separated secret names; no names means no secrets are loaded.
+    names: str = ""
+    region: str = "us-east-1"
+    # JSON file for the file backend, shaped {name: {KEY: value}}.
+    file: str | None = None
+    max_workers: int = 8
+    # Without a key nothing is cached on disk, secrets are never written
+    # in plain text.
+    cache_file: str | None = None
+    cache_key: str | None = Field(None, exclude=True)
+    cache_ttl_seconds: int = 3600
+    refresh_interval_seconds: float = 300
+
+    @property
+    def secret_names(self) -> list[str]:
+        return [name.strip() for name in self.names.split(",") if name.strip()]
+
+
+class SecretsBackend(Protocol):
+    def fetch(self, name: str) -> dict[str, str]: ...
+
+
+class SecretsManagerBackend:
+    """
+    AWS Secrets Manager, each secret a JSON object of variables.
+    """
+
+    def __init__(self, region: str, client=None):
+        self.region = region
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # boto3 clients are thread safe once created, creating them is not.
+        with self._lock:
+            if self._client is None:
+                import boto3
+
+                self._client = boto3.client("secretsmanager", region_name=self.region)
+        return self._client
+
+    def fetch(self, name: str) -> dict[str, str]:
+        response = self.client.get_secret_value(SecretId=name)
+        return json.loads(response["SecretString"])
+
+
+class FileBackend:
+    """
+    Secrets from a local JSON file, for development and tests.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def fetch(self, name: str) -> dict[str, str]:
+        secrets = json.loads(self.path.read_text())
+        if name not in secrets:
+            raise KeyError(f"Secret {name!r} not found in {self.path}")
+        return secrets[name]
+
+
+class EncryptedFileCache:
+    """
+    Fetched secrets in a Fernet-encrypted file. Fernet tokens carry their
+    creation time, so age is checked when decrypting.
+    """
+
+    def __init__(self, path: str, key: str):
+        from cryptography.fernet import Fernet
+
+        self.path = Path(path)
+        self.fernet = Fernet(key)
+
+    def read(self, max_age: float | None) -> dict[str, dict] | None:
+        """
+        The cached secrets, or None if missing, unreadable or older than
+        `max_age` seconds (any age when `max_age` is None).
+        """
+        from cryptography.fernet import InvalidToken
+
+        try:
+            token = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            data = self.fernet.decrypt(
+                token, ttl=None if max_age is None else max(int(max_age), 1)
+            )
+        except InvalidToken:
+            return None
+        return json.loads(data)
+
+    def write(self, secrets: dict[str, dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        token = self.fernet.encrypt(json.dumps(secrets).encode())
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(token)
+        os.replace(tmp, self.path)
+
+
+class SecretsProvider:
+    """
+    Loads secrets into the environment, where the config reads them.
+
+    All secrets are fetched concurrently, and the result is shared through
+    the encrypted cache: workers starting within `cache_ttl_seconds` of a
+    fetch, and refreshes within `refresh_interval_seconds`, read the file
+    instead of calling the backend. If fetching fails an expired cache is
+    used rather than none.
+
+    Variables already in the environment are left alone, so a value set
+    explicitly always wins over the secret.
+    """
+
+    def __init__(
+        self,
+        backend: SecretsBackend,
+        names: list[str],
+        cache: EncryptedFileCache | None = None,
+        cache_ttl_seconds: int = 3600,
+        refresh_interval_seconds: float = 300,
+        max_workers: int = 8,
+    ):
+        self.backend = backend
+        self.names = names
+        self.cache = cache
+        self.cache_ttl = cache_ttl_seconds
+        self.refresh_interval = refresh_interval_seconds
+        self.max_workers = max_workers
+        self.values: dict[str, str] = {}
+        self._owned: set[str] = set()
+        self._listeners: list[Callable[[], None]] = []
+
+    @classmethod
+    def from_settings(cls, settings: SecretsSettings) -> "SecretsProvider":
+        if settings.backend == "file":
+            if not settings.file:
+                raise ValueError("SECRETS_FILE is required for the file backend")
+            backend = FileBackend(settings.file)
+        else:
+            backend = SecretsManagerBackend(settings.region)
+        cache = None
+        if settings.cache_file and settings.cache_key:
+            cache = EncryptedFileCache(settings.cache_file, settings.cache_key)
+        return cls(
+            backend,
+            settings.secret_names,
+            cache=cache,
+            cache_ttl_seconds=settings.cache_ttl_seconds,
+            refresh_interval_seconds=settings.refresh_interval_seconds,
+            max_workers=settings.max_workers,
+        )
+
+    def fetch_all(self) -> dict[str, dict]:
+        workers = max(min(self.max_workers, len(self.names)), 1)
+        with ThreadPoolExecutor(workers, thread_name_prefix="secrets") as pool:
+            return dict(zip(self.names, pool.map(self.backend.fetch, self.names)))
+
+    def _read(self, max_age: float) -> tuple[dict[str, dict], str]:
+        if self.cache is not None:
+            cached = self.cache.read(max_age)
+            if cached is not None and set(self.names) <= cached.keys():
+                return cached, "cache"
+        try:
+            secrets = self.fetch_all()
+        except Exception:
+            stale = self.cache.read(None) if self.cache is not None else None
+            if stale is None or not set(self.names) <= stale.keys():
+                raise
+            logger.warning(
+                "Fetching secrets failed, using expired cache", exc_info=True
+            )
+            return stale, "stale"
+        if self.cache is not None:
+            try:
+                self.cache.write(secrets)
+            except OSError:
+                logger.warning("Writing the secrets cache failed", exc_info=True)
+        return secrets, "fetched"
+
+    def _values(self, secrets: dict[str, dict]) -> dict[str, str]:
+        values = {}
+        for name in self.names:
+            values.update({key: str(value) for key, value in secrets[name].items()})
+        return values
+
+    def _apply(self, values: dict[str, str]) -> Callable[[], None]:
+        """
+        Puts `values` into the environment and returns a function that
+        undoes it.
+        """
+        owned = set(self._owned)
+        previous = {key: os.environ.get(key) for key in owned | values.keys()}
+
+        def undo() -> None:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+            self._owned = owned
+
+        for key in self._owned - values.keys():
+            os.environ.pop(key, None)
+        self._owned &= values.keys()
+        for key, value in values.items():
+            if key in self._owned or key not in os.environ:
+                os.environ[key] = value
+                self._owned.add(key)
+        return undo
+
+    def load(self) -> None:
+        """
+        Loads the secrets into the environment. Called once before the
+        config is built; raises if they can't be fetched or read from cache.
+        """
+        secrets, source = self._read(self.cache_ttl)
+        self.values = self._values(secrets)
+        self._apply(self.values)
+        logger.info("Loaded %d secrets from %s", len(self.names), source)
+
+    def on_change(self, callback: Callable[[], None]) -> None:
+        self._listeners.append(callback)
+
+    async def refresh(self) -> bool:
+        """
+        Re-reads the secrets and, if any value changed, updates the
+        environment and notifies listeners. Returns whether anything changed.
+
+        If a listener fails (e.g. a rotated value doesn't validate) the
+        environment is restored and the change is retried next time.
+        """
+        secrets, source = await asyncio.to_thread(self._read, self.refresh_interval)
+        SECRETS_REFRESHES.labels(source).inc()
+        values = self._values(secrets)
+        if values == self.values:
+            return False
+        logger.info("Secrets changed, reloading config")
+        undo = self._apply(values)
+        try:
+            for callback in self._listeners:
+                callback()
+        except Exception:
+            undo()
+            raise
+        self.values = values
+        return True
+
+    async def refresh_forever(self) -> None:
+        """
+        Refreshes every `refresh_interval_seconds`. Runs until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                SECRETS_REFRESHES.labels("failed").inc()
+                logger.exception("Refreshing secrets failed, keeping current values")
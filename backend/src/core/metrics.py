@@ -0,0 +1,190 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+FAST_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by operation",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out",
+    multiprocess_mode="livesum",
+)
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command latency by command",
+    ["command"],
+    buckets=FAST_BUCKETS,
+)
+CRYPTO_LATENCY = Histogram(
+    "auth_crypto_duration_seconds",
+    "Latency of password hashing, JWT verification and ecrecover",
+    ["operation"],
+    buckets=FAST_BUCKETS,
+)
+PASSWORD_HASH_ROUNDS = Gauge(
+    "password_hash_bcrypt_rounds",
+    "bcrypt cost used for new password hashes",
+    multiprocess_mode="liveall",
+)
+PASSWORD_HASH_CALIBRATED_SECONDS = Gauge(
+    "password_hash_calibrated_seconds",
+    "Measured time of one hash at the calibrated bcrypt cost",
+    multiprocess_mode="liveall",
+)
+PASSWORD_REHASHES = Counter(
+    "password_rehashes_total",
+    "Password hashes upgraded on login",
+)
+LOADER_BATCH_SIZE = Histogram(
+    "dataloader_batch_size",
+    "Keys fetched per batched lookup",
+    ["loader"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+APP_READY = Gauge(
+    "app_ready",
+    "Workers that finished warm-up and are not shutting down",
+    multiprocess_mode="livesum",
+)
+WARMUP_STEP_SECONDS = Gauge(
+    "warmup_step_seconds",
+    "Duration of the successful run of each warm-up step",
+    ["step"],
+    multiprocess_mode="liveall",
+)
+SECRETS_REFRESHES = Counter(
+    "secrets_refreshes_total",
+    "Background secret refreshes by source",
+    ["result"],
+)
+JWT_CACHE_REQUESTS = Counter(
+    "jwt_cache_requests_total",
+    "Verified-token cache lookups by result",
+    ["result"],
+)
+REVOCATION_CHECKS = Counter(
+    "token_revocation_checks_total",
+    "Access token revocation checks by outcome",
+    ["result"],
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Requests rejected by the rate limiter by scope and deciding tier",
+    ["scope", "tier"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wakeup and when it actually ran",
+    buckets=FAST_BUCKETS,
+)
+
+
+@contextmanager
+def track_latency(histogram: Histogram, *labels: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(*labels) if labels else histogram
+        metric.observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """
+    Records per-route latency and in-flight requests.
+
+    Routes are labelled by their path template so path parameters do not
+    create a series per value.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,97 @@
+import hashlib
+from collections.abc import Callable
+from typing import Any
+
+import msgspec
+from fastapi import Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel
+
+from src.core.config import get_env
+
+config = get_env()
+
+
+class MsgspecResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return msgspec.json.encode(content)
+
+
+RESPONSE_CLASSES: dict[str, type[JSONResponse]] = {
+    "json": JSONResponse,
+    "orjson": ORJSONResponse,
+    "msgspec": MsgspecResponse,
+}
+
+
+def get_response_class() -> type[JSONResponse]:
+    return RESPONSE_CLASSES[config.api.response_class]
+
+
+class ModelResponse(Response):
+    """
+    Writes trusted models straight to JSON with their compiled serializer.
+
+    Returning it from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass, so only use it for models built by our own code.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: BaseModel | list[BaseModel]) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return b"[%b]" % b",".join(
+            item.__pydantic_serializer__.to_json(item) for item in content
+        )
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Strong ETag from the values a response body is built from.
+
+    Include everything the body depends on, plus a name for the
+    representation so different endpoints never share tags.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x".
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def conditional_response(
+    request: Request,
+    render: Callable[[], Response],
+    etag: str | None = None,
+    cache_control: str = "private, no-cache",
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Answers 304 Not Modified when the client already has this version.
+
+    With `etag` (see `make_etag`) `render` isn't called at all on a match,
+    so unchanged resources cost neither serialization nor bandwidth.
+    Without it the ETag is a hash of the rendered body, which still saves
+    the bandwidth. The default Cache-Control lets clients keep the body
+    but makes them revalidate every time.
+    """
+    response = None
+    if etag is None:
+        response = render()
+        etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    cache_headers = {"ETag": etag, "Cache-Control": cache_control, **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+    if response is None:
+        response = render()
+    response.headers.update(cache_headers)
+    return response
@@ -0,0 +1,46 @@
+import math
+import os
+from pathlib import Path
+
+from uvicorn_worker import UvicornWorker
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+class ProductionWorker(UvicornWorker):
+    """
+    Uvicorn worker pinned to uvloop and httptools.
+    """
+
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
+def _cgroup_cpu_limit() -> float | None:
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    try:
+        quota, period = (CGROUP_ROOT / "cpu.max").read_text().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    # cgroup v1
+    try:
+        quota = int((CGROUP_ROOT / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((CGROUP_ROOT / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 else None
+
+
+def available_cpus() -> int:
+    """
+    CPUs this process may use: the affinity mask, capped by the container's
+    cgroup CPU quota when there is one.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0
+    cpus = cpus or os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(math.ceil(limit), 1))
+    return cpus
@@ -0,0 +1,21 @@
+import re
+
+WALLET_ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+
+def normalize_wallet_address(address: str) -> str:
+    """
+    Returns the canonical lowercase `0x` form of an Ethereum address.
+    """
+    address = address.strip()
+    if not WALLET_ADDRESS.match(address):
+        raise ValueError("Invalid wallet address")
+    return address.lower()
+
+
+def wallet_to_bytes(address: str) -> bytes:
+    return bytes.fromhex(normalize_wallet_address(address)[2:])
+
+
+def wallet_from_bytes(value: bytes) -> str:
+    return "0x" + value.hex()
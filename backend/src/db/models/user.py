@@ -4,14 +4,26 @@ from uuid import uuid4, UUID
 from sqlalchemy import DateTime, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
+from src.db.types import WalletAddress
+
 from .base import Base
 
+# Wallet addresses live in the binary wallet_address_bytes columns; the old
+# text wallet_address columns are only kept in sync by a database trigger
+# until a later migration drops them.
+WALLET_ADDRESS_COLUMN = "wallet_address_bytes"
+
 
 class User(Base):
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
     username: Mapped[str] = mapped_column(String(50), unique=True)
     email: Mapped[str] = mapped_column(String(255), unique=True)
-    wallet_address: Mapped[str] = mapped_column(nullable=True, unique=True)
+    wallet_address: Mapped[str] = mapped_column(
+        WALLET_ADDRESS_COLUMN,
+        WalletAddress(),
+        nullable=True,
+        unique=True,
+    )
     nonce: Mapped[str] = mapped_column(nullable=True)
     hashed_password: Mapped[str]
     created_at: Mapped[datetime] = mapped_column(
@@ -29,6 +41,10 @@ class Web3User(Base):
     __tablename__ = "web3_users"
 
     id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
-    wallet_address: Mapped[str] = mapped_column(unique=True)
+    wallet_address: Mapped[str] = mapped_column(
+        WALLET_ADDRESS_COLUMN,
+        WalletAddress(),
+        unique=True,
+    )
     nonce: Mapped[str]
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -0,0 +1,37 @@
+import time
+from functools import lru_cache
+
+from redis.asyncio import Redis
+
+from src.core.config import get_env
+from src.core.metrics import REDIS_COMMAND_LATENCY
+
+config = get_env()
+
+
+class InstrumentedRedis(Redis):
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_LATENCY.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - start
+            )
+
+
+@lru_cache
+def get_redis() -> InstrumentedRedis:
+    return InstrumentedRedis(
+        host=config.redis.url,
+        port=config.redis.port,
+        decode_responses=True,
+    )
+
+
+@lru_cache
+def get_binary_redis() -> InstrumentedRedis:
+    return InstrumentedRedis(
+        host=config.redis.url,
+        port=config.redis.port,
+    )
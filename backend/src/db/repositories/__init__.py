@@ -1 +1,2 @@
+from .loaders import user_loader, web3_user_loader
 from .users import user_repo
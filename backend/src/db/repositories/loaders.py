@@ -0,0 +1,133 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Any, Generic, TypeVar
+from uuid import UUID
+
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.types import TypeDecorator
+
+from src.core.config import get_env
+from src.core.metrics import LOADER_BATCH_SIZE
+from src.db.models import User, Web3User
+from src.db.session import get_engine, get_session_maker
+
+config = get_env()
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces concurrent lookups by key.
+
+    Callers asking for a key that is already being fetched share that
+    fetch, and keys requested within `batch_window_ms` of each other are
+    fetched together with one call to `batch_fn`, which returns the values
+    it found by key. Nothing is cached once a batch completes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list[K]], Awaitable[dict[K, V]]],
+        batch_window_ms: float = 2,
+        max_batch_size: int = 100,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: dict[K, asyncio.Future] = {}
+        self._batch: list[K] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    def _enqueue(self, key: K) -> asyncio.Future:
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = self._pending[key] = loop.create_future()
+        self._batch.append(key)
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, keys: list[K]) -> None:
+        LOADER_BATCH_SIZE.labels(self.name).observe(len(keys))
+        try:
+            found = await self.batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                future = self._pending.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key in keys:
+            future = self._pending.pop(key)
+            if not future.done():
+                future.set_result(found.get(key))
+
+    async def load(self, key: K) -> V | None:
+        # Shielded so one caller giving up doesn't cancel the shared fetch.
+        return await asyncio.shield(self._enqueue(key))
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        futures = [self._enqueue(key) for key in keys]
+        return list(await asyncio.shield(asyncio.gather(*futures)))
+
+
+def _matches_any(column, values: list) -> Any:
+    """
+    `column = ANY(:values)` on Postgres, so every batch size shares one
+    prepared statement; a plain IN list elsewhere.
+    """
+    dialect = get_engine().dialect
+    if dialect.name != "postgresql":
+        return column.in_(values)
+    element_type = column.type
+    if isinstance(element_type, TypeDecorator):
+        # ARRAY binds its items with the underlying type only, so convert
+        # them the way the decorator would first.
+        values = [element_type.process_bind_param(v, dialect) for v in values]
+        element_type = element_type.impl_instance
+    return column == any_(bindparam("values", values, type_=ARRAY(element_type)))
+
+
+async def _users_by_id(ids: list[UUID]) -> dict[UUID, User]:
+    async with get_session_maker()() as session:
+        users = await session.scalars(select(User).where(_matches_any(User.id, ids)))
+        return {user.id: user for user in users}
+
+
+async def _web3_users_by_wallet(wallets: list[str]) -> dict[str, Web3User]:
+    async with get_session_maker()() as session:
+        users = await session.scalars(
+            select(Web3User).where(_matches_any(Web3User.wallet_address, wallets))
+        )
+        return {user.wallet_address: user for user in users}
+
+
+user_loader: DataLoader[UUID, User] = DataLoader(
+    "user_by_id",
+    _users_by_id,
+    batch_window_ms=config.loaders.batch_window_ms,
+    max_batch_size=config.loaders.max_batch_size,
+)
+web3_user_loader: DataLoader[str, Web3User] = DataLoader(
+    "web3_user_by_wallet",
+    _web3_users_by_wallet,
+    batch_window_ms=config.loaders.batch_window_ms,
+    max_batch_size=config.loaders.max_batch_size,
+)
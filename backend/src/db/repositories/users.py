@@ -1,13 +1,20 @@
+import logging
+
 from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from src.db.models import User, Web3User
+from src.core.metrics import PASSWORD_REHASHES
+from src.db.models import User
 from src.schemas.auth import Nonce, Web3NonceRequest
 from src.schemas.user import UserCreate
-from src.services.auth import hash_password, verify_password
+from src.services.hashing import password_hasher
 from src.services.jwt_service import create_token_pair
-from src.services.web3_auth import create_nonce
+from src.services.nonce_store import create_nonce, nonce_store
+
+logger = logging.getLogger(__name__)
 
 
 class UserRepository:
@@ -16,23 +23,19 @@ class UserRepository:
         user_create: UserCreate,
         session: AsyncSession,
     ) -> User:
-        existing_user = await session.scalar(
-            select(User).where(
-                (User.email == user_create.email)
-                | (User.username == user_create.username)
+        user = await session.scalar(
+            insert(User)
+            .values(
+                username=user_create.username,
+                email=user_create.email,
+                hashed_password=await password_hasher.hash(user_create.password),
             )
+            .on_conflict_do_nothing()
+            .returning(User)
         )
-        if existing_user:
+        if user is None:
             raise ValueError("User with this email or username already exists")
-
-        user = User(
-            username=user_create.username,
-            email=user_create.email,
-            hashed_password=hash_password(user_create.password),
-        )
-        session.add(user)
         await session.commit()
-        await session.refresh(user)
         return create_token_pair(user)
 
     async def authenticate_user(
@@ -49,30 +52,38 @@ class UserRepository:
                 )
             )
         )
-        if not user or not verify_password(password, user.hashed_password):
+        if not user:
+            raise ValueError("Invalid credentials")
+        valid, new_hash = await password_hasher.verify_and_update(
+            password,
+            user.hashed_password,
+        )
+        if not valid:
             raise ValueError("Invalid credentials")
+        if new_hash is not None:
+            await self._rehash_password(user, new_hash, session)
         return create_token_pair(user)
 
-    async def get_and_save_nonce(
+    async def _rehash_password(
         self,
-        data: Web3NonceRequest,
+        user: User,
+        new_hash: str,
         session: AsyncSession,
-    ):
-        user: Web3User = await session.scalar(
-            select(Web3User).where(Web3User.wallet_address == data.wallet)
-        )
-        nonce = create_nonce()
-
-        if not user:
-            user = Web3User(
-                wallet_address=data.wallet,
-                nonce=nonce,
-            )
-            session.add(user)
+    ) -> None:
+        # Best effort: the login already succeeded with the old hash.
+        try:
+            user.hashed_password = new_hash
+            await session.commit()
+        except SQLAlchemyError:
+            await session.rollback()
+            logger.warning("Storing upgraded password hash failed", exc_info=True)
         else:
-            user.nonce = nonce
-        await session.commit()
-        return Nonce(nonce=nonce)
+            PASSWORD_REHASHES.inc()
+
+    async def get_and_save_nonce(self, data: Web3NonceRequest) -> Nonce:
+        nonce = create_nonce()
+        await nonce_store.issue(data.wallet, nonce)
+        return Nonce.model_construct(nonce=nonce)
 
 
 user_repo = UserRepository()
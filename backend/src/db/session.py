@@ -1,14 +1,145 @@
+import asyncio
+import logging
+import time
 from collections.abc import AsyncGenerator
+from functools import lru_cache
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from src.core.config import get_env
+from src.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_WAIT, DB_QUERY_LATENCY
 
+logger = logging.getLogger(__name__)
 config = get_env()
-engine = create_async_engine(config.db.url)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.query_start = time.perf_counter()
+
+
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_start
+    operation = statement.lstrip().split(" ", 1)[0].upper()
+    DB_QUERY_LATENCY.labels(operation).observe(elapsed)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def _use_current_password(dialect, conn_rec, cargs, cparams):
+    # The URL is fixed when the engine is created; new connections pick up
+    # a rotated password from the reloaded config.
+    cparams["password"] = config.db.password
+
+
+@lru_cache
+def get_engine() -> AsyncEngine:
+    """
+    Created on first use so importing the app does not load the driver.
+    """
+    engine = create_async_engine(
+        config.db.url,
+        poolclass=InstrumentedPool,
+        pool_size=config.db.pool_size,
+        max_overflow=config.db.max_overflow,
+        pool_timeout=config.db.pool_timeout,
+        pool_recycle=config.db.pool_recycle,
+        pool_pre_ping=config.db.pool_pre_ping,
+        connect_args=(
+            {"statement_cache_size": config.db.statement_cache_size}
+            if config.db.url.startswith("postgresql+asyncpg")
+            else {}
+        ),
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", _start_query_timer)
+    event.listen(engine.sync_engine, "after_cursor_execute", _stop_query_timer)
+    event.listen(engine.sync_engine, "checkout", _on_checkout)
+    event.listen(engine.sync_engine, "checkin", _on_checkin)
+    if not config.db.dsn:
+        event.listen(engine.sync_engine, "do_connect", _use_current_password)
+    return engine
+
+
+@lru_cache
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_engine(), expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session_maker() as session:
+    async with get_session_maker()() as session:
         yield session
+
+
+async def warm_up_engine(connections: int = 1) -> None:
+    """
+    Opens `connections` pooled connections at once so the first requests
+    don't pay for connecting. Raises if any of them fails.
+    """
+    engine = get_engine()
+
+    async def open_connection():
+        connection = await engine.connect()
+        try:
+            await connection.execute(text("SELECT 1"))
+        except BaseException:
+            await connection.close()
+            raise
+        return connection
+
+    results = await asyncio.gather(
+        *(open_connection() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+async def dispose_engine() -> None:
+    if get_engine.cache_info().currsize:
+        await get_engine().dispose()
+
+
+def get_pool_stats() -> dict:
+    pool = get_engine().pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": config.db.max_overflow,
+        "wait_seconds": {
+            sample.labels.get("le", sample.name.rsplit("_", 1)[-1]): sample.value
+            for metric in DB_POOL_WAIT.collect()
+            for sample in metric.samples
+            if not sample.name.endswith("_created")
+        },
+    }
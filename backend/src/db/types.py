@@ -0,0 +1,26 @@
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from src.core.wallets import wallet_from_bytes, wallet_to_bytes
+
+
+class WalletAddress(TypeDecorator):
+    """
+    An Ethereum address stored as its 20 raw bytes.
+
+    Accepts any casing on the way in and reads back as lowercase `0x` hex,
+    so lookups match no matter how the client wrote the address.
+    """
+
+    impl = LargeBinary(20)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, bytes):
+            return value
+        return wallet_to_bytes(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return wallet_from_bytes(bytes(value))
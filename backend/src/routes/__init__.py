@@ -1,3 +1,7 @@
 from .auth import router as auth_router
 from .users import router as users_router
 from .tests import router as tests_router
+from .internal import router as internal_router
+from .admin import router as admin_router
+from .well_known import router as well_known_router
+from .health import router as health_router
@@ -0,0 +1,72 @@
+import json
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from src.db.session import get_engine
+from src.services.auth import require_admin
+from src.services.hashing import password_hasher
+from src.services.user_import import (
+    ImportReport,
+    UserImporter,
+    iter_file_chunks,
+    iter_lines,
+    parse_rows,
+)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+# Uploads larger than this are spooled to a temporary file.
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+@router.post("/users/import")
+async def import_users(
+    request: Request,
+    table: Literal["users", "web3_users"] = "users",
+    format: Literal["csv", "jsonl"] = "jsonl",
+    chunk_size: int = Query(5000, ge=1, le=50_000),
+):
+    """
+    Stream a CSV or JSONL body into the users tables.
+
+    Responds with newline-delimited JSON: one progress line per chunk and
+    the full report, including conflicting keys, as the last line.
+    """
+    # The body must be read before responding: while a response streams,
+    # Starlette listens for disconnects and discards unread body messages.
+    body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    try:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+    except BaseException:
+        body.close()
+        raise
+
+    async def progress():
+        report = ImportReport(table=table)
+        async with UserImporter(
+            get_engine(),
+            table=table,
+            chunk_size=chunk_size,
+            workers=password_hasher.max_workers,
+            hasher=password_hasher,
+        ) as importer:
+            rows = parse_rows(iter_lines(iter_file_chunks(body)), format)
+            async for report in importer.run(rows):
+                yield json.dumps(report.progress()) + "\n"
+        yield json.dumps(report.as_dict()) + "\n"
+
+    return StreamingResponse(
+        progress(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(body.close),
+    )
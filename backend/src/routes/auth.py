@@ -1,12 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.services.web3_auth import verify_signature
+from src.core.responses import ModelResponse
+from src.services.rate_limit import rate_limit
+from src.services.auth import http_bearer, revoke_tokens
+from src.services.refresh_tokens import refresh_token_store
+from src.services.web3_auth import verify_signature, verify_signatures
 from src.schemas.user import UserCreate
 from src.schemas.auth import (
     LoginRequest,
+    LogoutRequest,
     Nonce,
+    RefreshRequest,
     TokenPair,
+    Web3BatchLoginRequest,
+    Web3BatchLoginResult,
     Web3LoginRequest,
     Web3NonceRequest,
 )
@@ -16,13 +25,17 @@ from src.db.repositories import user_repo
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
-@router.post("/jwt/register", response_model=TokenPair)
+@router.post(
+    "/jwt/register",
+    response_model=TokenPair,
+    dependencies=[Depends(rate_limit("register", identifier_field="email"))],
+)
 async def jwt_register(
     user_create: UserCreate,
     session: AsyncSession = Depends(get_async_session),
 ):
     try:
-        return await user_repo.register_user(user_create, session)
+        return ModelResponse(await user_repo.register_user(user_create, session))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,16 +43,22 @@ async def jwt_register(
         )
 
 
-@router.post("/jwt/login", response_model=TokenPair)
+@router.post(
+    "/jwt/login",
+    response_model=TokenPair,
+    dependencies=[Depends(rate_limit("login", identifier_field="identifier"))],
+)
 async def jwt_login(
     data: LoginRequest,
     session: AsyncSession = Depends(get_async_session),
 ):
     try:
-        return await user_repo.authenticate_user(
-            data.identifier,
-            data.password,
-            session,
+        return ModelResponse(
+            await user_repo.authenticate_user(
+                data.identifier,
+                data.password,
+                session,
+            )
         )
     except ValueError as e:
         raise HTTPException(
@@ -48,12 +67,24 @@ async def jwt_login(
         )
 
 
-@router.post("/web3/get_nonce", response_model=Nonce)
-async def web3_get_nonce(
-    data: Web3NonceRequest,
-    session: AsyncSession = Depends(get_async_session),
+@router.post("/jwt/refresh", response_model=TokenPair)
+async def jwt_refresh(data: RefreshRequest):
+    return ModelResponse(
+        await refresh_token_store.rotate(data.refresh_token, "default")
+    )
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    data: LogoutRequest | None = None,
+    credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
 ):
-    return await user_repo.get_and_save_nonce(data, session)
+    await revoke_tokens(credentials.credentials, data.refresh_token if data else None)
+
+
+@router.post("/web3/get_nonce", response_model=Nonce)
+async def web3_get_nonce(data: Web3NonceRequest):
+    return ModelResponse(await user_repo.get_and_save_nonce(data))
 
 
 @router.post("/web3/login", response_model=TokenPair)
@@ -61,8 +92,23 @@ async def web3_login(
     data: Web3LoginRequest,
     session: AsyncSession = Depends(get_async_session),
 ):
-    return await verify_signature(
+    tokens = await verify_signature(
         signature=data.signature,
         expected_address=data.address,
+        nonce=data.nonce,
         session=session,
     )
+    return ModelResponse(tokens)
+
+
+@router.post("/web3/login/batch", response_model=list[Web3BatchLoginResult])
+async def web3_login_batch(
+    data: Web3BatchLoginRequest,
+    session: AsyncSession = Depends(get_async_session),
+):
+    return ModelResponse(await verify_signatures(data.items, session))
+
+
+@router.post("/web3/refresh", response_model=TokenPair)
+async def web3_refresh(data: RefreshRequest):
+    return ModelResponse(await refresh_token_store.rotate(data.refresh_token, "web3"))
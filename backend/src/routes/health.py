@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, status
+
+from src.services.warmup import warm_up
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness: the worker is up and its event loop responds.
+    """
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness: warm-up has finished and the worker is not shutting down.
+    """
+    if not warm_up.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"status": "not_ready", "checks": warm_up.checks},
+        )
+    return {"status": "ready", "checks": warm_up.checks}
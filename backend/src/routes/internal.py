@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends
+
+from src.db.session import get_pool_stats
+from src.services.auth import require_admin
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/db-pool")
+async def db_pool_stats():
+    return get_pool_stats()
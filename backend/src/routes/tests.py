@@ -1,35 +1,30 @@
 import asyncio
 
-from redis.asyncio import Redis
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-from src.core.config import get_env
+from src.services.cache import response_cache
 
 router = APIRouter(prefix="/tests", tags=["Tests"])
-config = get_env()
-redis = Redis(
-    host=config.redis.url,
-    port=6379,
-    decode_responses=True,
-)
 
 
-@router.get("/no-cache")
-async def no_cache():
+async def expensive_result() -> str:
     await asyncio.sleep(2)
-    return {"cached": False, "data": "expensive result"}
+    return "expensive result"
 
 
-@router.get("/with-cache")
-async def with_cache():
-    cache_key = "expensive_result"
-    cached = await redis.get(cache_key)
-
-    if cached:
-        return {"cached": True, "data": cached}
+@router.get("/no-cache")
+async def no_cache():
+    return {"cached": False, "data": await expensive_result()}
 
-    await asyncio.sleep(2)
-    result = "expensive result"
-    await redis.set(cache_key, result, ex=60)
 
-    return {"cached": False, "data": result}
+@router.get("/with-cache")
+async def with_cache(response: Response):
+    # Not @cached: the body reports whether it came from the cache.
+    data, status = await response_cache.get_or_compute(
+        "cache:tests:with-cache",
+        expensive_result,
+        ttl=60,
+        stale_ttl=30,
+    )
+    response.headers["X-Cache"] = status
+    return {"cached": status != "MISS", "data": data}
@@ -1,24 +1,89 @@
 from typing import Union
-from fastapi import APIRouter, Depends
+from uuid import UUID
 
-from src.schemas.user import UserRead, Web3UserRead
-from src.db.models.user import User, Web3User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from src.schemas.user import UserPublic, UserRead, Web3UserRead
 from src.core.config import get_env
+from src.core.responses import ModelResponse, conditional_response, make_etag
+from src.db.repositories import user_loader
 from src.services.auth import get_current_user
+from src.services.principals import Principal
 
 router = APIRouter(prefix="/users", tags=["Users"])
 config = get_env()
 
+MAX_BATCH_IDS = 100
+
+
+def _parse_ids(ids: list[str]) -> list[UUID]:
+    # Accepts both ?ids=a&ids=b and ?ids=a,b
+    values = [value for item in ids for value in item.split(",") if value]
+    if len(values) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_BATCH_IDS} ids per request",
+        )
+    try:
+        return list(dict.fromkeys(UUID(value) for value in values))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid user id",
+        )
+
+
+@router.get("", response_model=list[UserPublic])
+async def get_users(
+    request: Request,
+    ids: list[str] = Query(...),
+    _: Principal = Depends(get_current_user),
+):
+    """
+    Looks up several users at once; unknown ids are left out. Only public
+    fields are returned, emails are visible to their owner alone.
+    """
+    users = [user for user in await user_loader.load_many(_parse_ids(ids)) if user]
+    return conditional_response(
+        request,
+        lambda: ModelResponse(
+            [
+                UserPublic.model_construct(id=str(user.id), username=user.username)
+                for user in users
+            ]
+        ),
+        etag=make_etag("users", [(user.id, user.updated_at) for user in users]),
+        headers={"Vary": "Authorization"},
+    )
+
+
+def _render_profile(user: Principal) -> ModelResponse:
+    if user.user_type == "default":
+        return ModelResponse(
+            UserRead.model_construct(
+                id=user.id,
+                username=user.username,
+                email=user.email,
+            )
+        )
+    return ModelResponse(
+        Web3UserRead.model_construct(id=user.id, wallet=user.wallet_address)
+    )
+
 
 @router.get("/me", response_model=Union[UserRead, Web3UserRead])
-async def my_profile(user: User | Web3User = Depends(get_current_user)):
-    if isinstance(user, User):
-        return {
-            "id": str(user.id),
-            "username": user.username,
-            "email": user.email,
-        }
-    return {
-        "id": str(user.id),
-        "wallet": user.wallet_address,
-    }
+async def my_profile(request: Request, user: Principal = Depends(get_current_user)):
+    # The principal holds exactly what the body is rendered from.
+    return conditional_response(
+        request,
+        lambda: _render_profile(user),
+        etag=make_etag(
+            "users/me",
+            user.id,
+            user.user_type,
+            user.username,
+            user.email,
+            user.wallet_address,
+        ),
+        headers={"Vary": "Authorization"},
+    )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+
+from src.core.config import get_env
+from src.services.signing_keys import key_ring
+
+router = APIRouter(prefix="/.well-known", tags=["Well-known"])
+config = get_env()
+
+
+@router.get("/jwks.json")
+async def jwks(response: Response):
+    """
+    Public keys for verifying access tokens without calling this API.
+    """
+    response.headers["Cache-Control"] = (
+        f"public, max-age={config.jwt.jwks_max_age_seconds}"
+    )
+    return key_ring.jwks()
@@ -1,4 +1,10 @@
-from pydantic import BaseModel
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, Field
+
+from src.core.wallets import normalize_wallet_address
+
+WalletAddress = Annotated[str, AfterValidator(normalize_wallet_address)]
 
 
 class TokenPair(BaseModel):
@@ -7,20 +13,39 @@ class TokenPair(BaseModel):
     token_type: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
 class LoginRequest(BaseModel):
     identifier: str
     password: str
 
 
 class Web3NonceRequest(BaseModel):
-    wallet: str
+    wallet: WalletAddress
 
 
 class Web3LoginRequest(BaseModel):
     nonce: str
-    address: str
+    address: WalletAddress
     signature: str
 
 
+class Web3BatchLoginRequest(BaseModel):
+    items: list[Web3LoginRequest] = Field(min_length=1, max_length=100)
+
+
+class Web3BatchLoginResult(BaseModel):
+    address: str
+    valid: bool
+    tokens: TokenPair | None = None
+    detail: str | None = None
+
+
 class Nonce(BaseModel):
     nonce: str
@@ -7,9 +7,12 @@ class UserCreate(BaseModel):
     password: str
 
 
-class UserRead(BaseModel):
+class UserPublic(BaseModel):
     id: str
     username: str
+
+
+class UserRead(UserPublic):
     email: EmailStr
 
 
@@ -1,29 +1,24 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from uuid import UUID
+
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from passlib.context import CryptContext
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.config import get_env
+from src.core.wallets import normalize_wallet_address
 from src.services.jwt_service import decode_access_token
-from src.db.models import User, Web3User
-from src.db.session import get_async_session
+from src.services.principals import Principal, principal_cache
+from src.services.refresh_tokens import refresh_token_store
+from src.services.revocation import revocation_list
+from src.db.repositories.loaders import user_loader, web3_user_loader
 
 http_bearer = HTTPBearer()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+config = get_env()
 
 
 async def get_current_user(
-    session: AsyncSession = Depends(get_async_session),
     credentials: HTTPAuthorizationCredentials = Depends(http_bearer),
-):
+) -> Principal:
     payload = decode_access_token(credentials.credentials)
     user_id = payload.get("sub")
     if user_id is None:
@@ -32,15 +27,78 @@ async def get_current_user(
             detail="Token missing subject",
         )
     user_type = payload.get("user_type")
-    if user_type == "default":
-        user = await session.scalar(select(User).where(User.id == user_id))
-    elif user_type == "web3":
-        user = await session.scalar(
-            select(Web3User).where(Web3User.wallet_address == payload.get("wallet"))
+    if user_type not in ("default", "web3"):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid token",
+        )
+    if await revocation_list.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    if config.principal_cache.claims_only:
+        return Principal.from_claims(payload)
+
+    principal = await principal_cache.get(user_type, user_id)
+    if principal is not None:
+        return principal
+
+    try:
+        if user_type == "default":
+            user = await user_loader.load(UUID(user_id))
+        else:
+            wallet = normalize_wallet_address(payload.get("wallet") or "")
+            user = await web3_user_loader.load(wallet)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid token",
         )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    return user
+    principal = Principal.from_user(user)
+    await principal_cache.set(principal)
+    return principal
+
+
+async def revoke_tokens(access_token: str, refresh_token: str | None = None) -> None:
+    """
+    Revokes the access token and, when given, every refresh token rotated
+    from the same login as `refresh_token`.
+    """
+    payload = decode_access_token(access_token)
+    if payload.get("jti"):
+        await revocation_list.revoke(payload["jti"], payload["exp"])
+    if refresh_token:
+        await refresh_token_store.revoke_family(refresh_token)
+
+
+def _matches(value: str | None, expected: str | None) -> bool:
+    return bool(value and expected and secrets.compare_digest(value, expected))
+
+
+async def require_admin(x_admin_key: str | None = Header(default=None)) -> None:
+    if not _matches(x_admin_key, config.admin.api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+
+
+async def require_metrics_access(
+    authorization: str | None = Header(default=None),
+    x_admin_key: str | None = Header(default=None),
+) -> None:
+    scheme, _, token = (authorization or "").partition(" ")
+    if not (
+        (scheme.lower() == "bearer" and _matches(token, config.metrics.token))
+        or _matches(x_admin_key, config.admin.api_key)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Metrics access required",
+        )
@@ -0,0 +1,333 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlencode
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import get_env
+from src.db.redis import get_binary_redis
+from src.services.principals import Principal
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class JsonSerializer:
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value).encode()
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+
+SERIALIZERS = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+    "msgpack": MsgpackSerializer,
+}
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class ResponseCache:
+    """
+    Two-tier response cache with single-flight recomputation.
+
+    Concurrent misses for a key share one computation inside a worker and
+    a Redis lock makes other workers wait for that result instead of
+    recomputing it. Entries past `ttl` but within `stale_ttl` are served
+    while a single background refresh runs.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        serializer: str = "orjson",
+        l1_ttl_seconds: float = 5,
+        l1_max_size: int = 1024,
+        lock_timeout_ms: int = 10_000,
+    ):
+        self._redis = redis
+        self.serializer = SERIALIZERS[serializer]
+        self.l1_ttl = l1_ttl_seconds
+        self.l1_max_size = l1_max_size
+        self.lock_timeout = lock_timeout_ms / 1000
+        self._entries: OrderedDict[str, tuple[float, CacheEntry]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._release_lock = None
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_binary_redis()
+        return self._redis
+
+    def _get_local(self, key: str) -> CacheEntry | None:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _set_local(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = (time.monotonic() + self.l1_ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.l1_max_size:
+            self._entries.popitem(last=False)
+
+    async def _get_remote(self, key: str) -> CacheEntry | None:
+        try:
+            data = await self.redis.get(key)
+        except RedisError:
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+        if data is None:
+            return None
+        return CacheEntry(*self.serializer.loads(data))
+
+    async def get(self, key: str) -> CacheEntry | None:
+        entry = self._get_local(key)
+        if entry is None:
+            entry = await self._get_remote(key)
+            if entry is not None:
+                self._set_local(key, entry)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: int, stale_ttl: int = 0) -> None:
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+        self._set_local(key, entry)
+        try:
+            await self.redis.set(
+                key,
+                self.serializer.dumps(
+                    [entry.value, entry.fresh_until, entry.stale_until]
+                ),
+                ex=ttl + stale_ttl,
+            )
+        except RedisError:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    async def _acquire(self, key: str) -> str | None:
+        """
+        Returns a lock token when the caller should compute the value.
+        """
+        token = secrets.token_hex(16)
+        try:
+            acquired = await self.redis.set(
+                f"lock:{key}",
+                token,
+                nx=True,
+                px=int(self.lock_timeout * 1000),
+            )
+        except RedisError:
+            logger.warning("Response cache lock failed", exc_info=True)
+            return token
+        return token if acquired else None
+
+    async def _release(self, key: str, token: str) -> None:
+        if self._release_lock is None:
+            self._release_lock = self.redis.register_script(RELEASE_LOCK_SCRIPT)
+        try:
+            await self._release_lock(keys=[f"lock:{key}"], args=[token])
+        except RedisError:
+            logger.warning("Response cache unlock failed", exc_info=True)
+
+    async def _fill(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+    ) -> Any:
+        token = await self._acquire(key)
+        if token is None:
+            # Another worker is computing this key, wait for its result.
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await self._get_remote(key)
+                if entry is not None and entry.fresh_until > time.time():
+                    self._set_local(key, entry)
+                    return entry.value
+        try:
+            value = jsonable_encoder(await compute())
+            await self.set(key, value, ttl, stale_ttl)
+            return value
+        finally:
+            if token is not None:
+                await self._release(key, token)
+
+    def _single_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int,
+        background: bool = False,
+    ) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, compute, ttl, stale_ttl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            if background:
+                task.add_done_callback(self._log_refresh_error)
+        return task
+
+    def _log_refresh_error(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed", exc_info=task.exception())
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int,
+        stale_ttl: int = 0,
+    ) -> tuple[Any, str]:
+        entry = await self.get(key)
+        now = time.time()
+        if entry is not None and entry.fresh_until > now:
+            return entry.value, "HIT"
+        if entry is not None and entry.stale_until > now:
+            self._single_flight(key, compute, ttl, stale_ttl, background=True)
+            return entry.value, "STALE"
+        task = self._single_flight(key, compute, ttl, stale_ttl)
+        return await asyncio.shield(task), "MISS"
+
+
+response_cache = ResponseCache(
+    serializer=config.response_cache.serializer,
+    l1_ttl_seconds=config.response_cache.l1_ttl_seconds,
+    l1_max_size=config.response_cache.l1_max_size,
+    lock_timeout_ms=config.response_cache.lock_timeout_ms,
+)
+
+
+def build_cache_key(namespace: str, request: Request, user: str | None = None) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    raw = f"{request.url.path}?{query}|{user or ''}"
+    return f"cache:{namespace}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def cached(
+    ttl: int = 60,
+    stale_ttl: int = 0,
+    namespace: str | None = None,
+    shared: bool = False,
+):
+    """
+    Cache a route's result keyed by path, query string and user.
+
+    The user is the route's `Principal` argument or else the request's
+    credentials, so one caller's response is never served to another.
+    Pass `shared=True` only for responses that are the same for everyone.
+
+    With `stale_ttl` the stale value is served while the route is
+    re-run in the background, so only use it on routes that do not depend
+    on request-scoped resources such as a DB session.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        parameters = list(signature.parameters.values())
+        extra = [
+            inspect.Parameter(
+                "__cache_request",
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=Request,
+            ),
+            inspect.Parameter(
+                "__cache_response",
+                inspect.Parameter.KEYWORD_ONLY,
+                annotation=Response,
+            ),
+        ]
+        key_namespace = namespace or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop("__cache_request")
+            response: Response = kwargs.pop("__cache_response")
+            user = None
+            if not shared:
+                principal = next(
+                    (v for v in kwargs.values() if isinstance(v, Principal)),
+                    None,
+                )
+                credentials = "|".join(
+                    request.headers.get(name, "")
+                    for name in ("authorization", "cookie")
+                )
+                if principal is not None:
+                    user = f"{principal.user_type}:{principal.id}"
+                elif credentials != "|":
+                    user = hashlib.sha256(credentials.encode()).hexdigest()
+
+            value, status = await response_cache.get_or_compute(
+                build_cache_key(key_namespace, request, user),
+                lambda: func(*args, **kwargs),
+                ttl,
+                stale_ttl,
+            )
+            response.headers["X-Cache"] = status
+            return value
+
+        wrapper.__signature__ = signature.replace(parameters=parameters + extra)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException, status
+
+from src.core.config import get_env
+from src.core.metrics import (
+    CRYPTO_LATENCY,
+    PASSWORD_HASH_CALIBRATED_SECONDS,
+    PASSWORD_HASH_ROUNDS,
+    track_latency,
+)
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+@lru_cache
+def get_pwd_context(rounds: int | None = None):
+    # Imported on first use, nothing at startup needs passlib.
+    from passlib.context import CryptContext
+
+    rounds = rounds or config.hashing.bcrypt_rounds or DEFAULT_BCRYPT_ROUNDS
+    # Hashes below the current cost are flagged for rehash on login; higher
+    # ones are kept so instances calibrated differently don't fight.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    return get_pwd_context(rounds).hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str,
+    rounds: int | None = None,
+) -> tuple[bool, str | None]:
+    """
+    Returns whether the password matches and, if the hash is weaker than
+    the current settings, a new hash to store in its place.
+    """
+    return get_pwd_context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+def _time_hash(rounds: int, samples: int = 1) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hash_password("calibration-password", rounds)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = 10,
+    max_rounds: int = 15,
+) -> tuple[int, float]:
+    """
+    Picks the highest bcrypt cost whose hash fits in `target_ms` on this
+    machine, never going below `min_rounds`.
+
+    Each extra round doubles the work, so one measurement at `min_rounds`
+    predicts the rest. Returns the rounds and the measured seconds per hash.
+    """
+    base = _time_hash(min_rounds, samples=3)
+    rounds = min_rounds
+    predicted_ms = base * 1000
+    while rounds < max_rounds and predicted_ms * 2 <= target_ms:
+        rounds += 1
+        predicted_ms *= 2
+    seconds = base if rounds == min_rounds else _time_hash(rounds)
+    return rounds, seconds
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded worker pool so it never blocks the event loop.
+
+    Calls beyond `max_pending` (running + queued) are rejected with 503
+    instead of piling up behind the pool.
+    """
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        max_workers: int | None = None,
+        max_pending: int = 64,
+    ):
+        self.executor_type = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rounds = config.hashing.bcrypt_rounds or DEFAULT_BCRYPT_ROUNDS
+        self._executor: Executor | None = None
+        PASSWORD_HASH_ROUNDS.set(self.rounds)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        with track_latency(CRYPTO_LATENCY, "bcrypt_hash"):
+            return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        with track_latency(CRYPTO_LATENCY, "bcrypt_verify"):
+            return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self,
+        plain_password: str,
+        hashed_password: str,
+    ) -> tuple[bool, str | None]:
+        with track_latency(CRYPTO_LATENCY, "bcrypt_verify"):
+            return await self._run(
+                verify_and_update_password,
+                plain_password,
+                hashed_password,
+                self.rounds,
+            )
+
+    async def calibrate(
+        self,
+        target_ms: float,
+        min_rounds: int = 10,
+        max_rounds: int = 15,
+    ) -> int:
+        """
+        Measures bcrypt on the pool that will run it and adopts the result.
+        """
+        loop = asyncio.get_running_loop()
+        rounds, seconds = await loop.run_in_executor(
+            self.executor,
+            calibrate_bcrypt_rounds,
+            target_ms,
+            min_rounds,
+            max_rounds,
+        )
+        logger.info(
+            "Calibrated bcrypt to %d rounds (%.0f ms per hash, target %.0f ms)",
+            rounds,
+            seconds * 1000,
+            target_ms,
+        )
+        self.rounds = rounds
+        PASSWORD_HASH_ROUNDS.set(rounds)
+        PASSWORD_HASH_CALIBRATED_SECONDS.set(seconds)
+        return rounds
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=config.hashing.executor,
+    max_workers=config.hashing.max_workers,
+    max_pending=config.hashing.max_pending,
+)
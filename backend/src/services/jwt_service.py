@@ -1,29 +1,90 @@
+import hashlib
+import time
+import uuid
+from collections import OrderedDict
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 
-import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
 from fastapi import HTTPException, status
 
 from src.core.config import get_env
+from src.core.metrics import CRYPTO_LATENCY, JWT_CACHE_REQUESTS, track_latency
 from src.db.models import User, Web3User
 from src.schemas.auth import TokenPair
+from src.services.principals import Principal
+from src.services.signing_keys import key_ring
 
 config = get_env()
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified access token payloads.
+
+    Entries are keyed by a digest of the token and dropped once their `exp`
+    has passed, so a hit never outlives the token itself.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, payload = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                JWT_CACHE_REQUESTS.labels("hit").inc()
+                return payload
+            del self._entries[key]
+        self.misses += 1
+        JWT_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    def set(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if self.max_size <= 0 or expires_at is None:
+            return
+        self._entries[self._key(token)] = (float(expires_at), payload)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+
+token_cache = VerifiedTokenCache(config.jwt.cache_size)
+# Tokens verified with a key that was removed or replaced must not keep
+# verifying from the cache.
+key_ring.on_change(token_cache.clear)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=config.jwt.access_token_expire_minutes)
     )
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid.uuid4().hex)
 
-    return jwt.encode(
-        payload=to_encode,
-        key=config.jwt.secret_key,
-        algorithm=config.jwt.algorithm,
-    )
+    return key_ring.encode(to_encode)
 
 
 def create_refresh_token(data: dict) -> str:
@@ -33,51 +94,83 @@ def create_refresh_token(data: dict) -> str:
     )
     to_encode.update({"exp": expire})
 
-    return jwt.encode(
-        payload=to_encode,
-        key=config.jwt.secret_key,
-        algorithm=config.jwt.algorithm,
-    )
+    return key_ring.encode(to_encode)
 
 
-def create_token_pair(user: User | Web3User) -> TokenPair:
-    access_token_payload = {
-        "sub": str(user.id),
-        "type": "access",
-    }
+def _identity_claims(principal: Principal) -> dict:
+    claims = {"sub": principal.id, "user_type": principal.user_type}
+    if principal.user_type == "default":
+        claims["username"] = principal.username
+        claims["email"] = principal.email
+    else:
+        claims["wallet"] = principal.wallet_address
+    return claims
 
-    if isinstance(user, User):
-        access_token_payload["username"] = user.username
-        access_token_payload["email"] = user.email
-        access_token_payload["user_type"] = "default"
-    elif isinstance(user, Web3User):
-        access_token_payload["wallet"] = user.wallet_address
-        access_token_payload["user_type"] = "web3"
 
+def create_token_pair(
+    user: User | Web3User | Principal,
+    family: str | None = None,
+) -> TokenPair:
+    """
+    Issues an access/refresh pair. Refresh tokens carry a unique `jti` and
+    the `fam` id of the login they descend from, which `family` keeps
+    when rotating.
+    """
+    principal = user if isinstance(user, Principal) else Principal.from_user(user)
+    claims = _identity_claims(principal)
+    access_token_payload = {**claims, "type": "access"}
     refresh_token_payload = {
-        "sub": str(user.id),
+        **claims,
         "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
     }
-    return TokenPair(
+    return TokenPair.model_construct(
         access_token=create_access_token(access_token_payload),
         refresh_token=create_refresh_token(refresh_token_payload),
         token_type="bearer",
     )
 
 
-def decode_access_token(token: str):
+def decode_refresh_token(token: str) -> dict:
     try:
-        payload = jwt.decode(
-            jwt=token,
-            key=config.jwt.secret_key,
-            algorithms=[config.jwt.algorithm],
+        with track_latency(CRYPTO_LATENCY, "jwt_decode"):
+            payload = key_ring.decode(
+                token,
+                options={"require": ["exp", "sub", "jti", "fam"]},
+            )
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired",
         )
+    except InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+    if payload.get("type") != "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid token type",
+        )
+    return payload
+
+
+def decode_access_token(token: str):
+    cached = token_cache.get(token)
+    if cached is not None:
+        return dict(cached)
+    try:
+        with track_latency(CRYPTO_LATENCY, "jwt_decode"):
+            payload = key_ring.decode(token)
         if payload.get("type") != "access":
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="Invalid token type",
             )
-        return payload
+        token_cache.set(token, payload)
+        return dict(payload)
     except ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
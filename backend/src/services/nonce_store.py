@@ -0,0 +1,119 @@
+import secrets
+import string
+import time
+from abc import ABC, abstractmethod
+
+from redis.asyncio import Redis
+
+from src.core.config import get_env
+from src.db.redis import get_redis
+
+config = get_env()
+
+# Deletes each nonce only if it matches, so a wrong guess cannot burn the
+# owner's nonce. Returns 1/0 per key.
+CONSUME_SCRIPT = """
+local results = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("GET", key) == ARGV[i] then
+        redis.call("DEL", key)
+        results[i] = 1
+    else
+        results[i] = 0
+    end
+end
+return results
+"""
+
+
+def create_nonce(length: int = 24) -> str:
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+class NonceStore(ABC):
+    """
+    Short-lived login nonces keyed by wallet address.
+
+    A nonce can be consumed only once, so a signed message cannot be
+    replayed after a successful login. Consuming with the wrong nonce
+    leaves the stored one in place.
+    """
+
+    @staticmethod
+    def key(wallet: str) -> str:
+        return f"nonce:{wallet.lower()}"
+
+    @abstractmethod
+    async def issue(self, wallet: str, nonce: str) -> None: ...
+
+    @abstractmethod
+    async def consume(self, wallet: str, nonce: str) -> bool:
+        """
+        Deletes the wallet's nonce if it is `nonce`. Returns whether it was.
+        """
+
+    async def consume_many(self, pairs: list[tuple[str, str]]) -> list[bool]:
+        return [await self.consume(wallet, nonce) for wallet, nonce in pairs]
+
+
+class RedisNonceStore(NonceStore):
+    def __init__(self, ttl_seconds: int, redis: Redis | None = None):
+        self.ttl = ttl_seconds
+        self._redis = redis
+        self._consume = None
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    async def issue(self, wallet: str, nonce: str) -> None:
+        await self.redis.set(self.key(wallet), nonce, ex=self.ttl)
+
+    async def consume(self, wallet: str, nonce: str) -> bool:
+        return (await self.consume_many([(wallet, nonce)]))[0]
+
+    async def consume_many(self, pairs: list[tuple[str, str]]) -> list[bool]:
+        if not pairs:
+            return []
+        if self._consume is None:
+            self._consume = self.redis.register_script(CONSUME_SCRIPT)
+        results = await self._consume(
+            keys=[self.key(wallet) for wallet, _ in pairs],
+            args=[nonce for _, nonce in pairs],
+        )
+        return [bool(result) for result in results]
+
+
+class InMemoryNonceStore(NonceStore):
+    def __init__(self, ttl_seconds: int):
+        self.ttl = ttl_seconds
+        self._nonces: dict[str, tuple[float, str]] = {}
+
+    async def issue(self, wallet: str, nonce: str) -> None:
+        self._nonces[self.key(wallet)] = (time.monotonic() + self.ttl, nonce)
+
+    async def consume(self, wallet: str, nonce: str) -> bool:
+        key = self.key(wallet)
+        entry = self._nonces.get(key)
+        if entry is None:
+            return False
+        expires_at, stored = entry
+        if expires_at <= time.monotonic():
+            del self._nonces[key]
+            return False
+        if not secrets.compare_digest(stored.encode(), nonce.encode()):
+            return False
+        del self._nonces[key]
+        return True
+
+
+def get_nonce_store() -> NonceStore:
+    if config.web3.nonce_store == "memory":
+        return InMemoryNonceStore(config.web3.nonce_ttl_seconds)
+    return RedisNonceStore(config.web3.nonce_ttl_seconds)
+
+
+nonce_store = get_nonce_store()
@@ -0,0 +1,141 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import get_env
+from src.db.models import User, Web3User
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Compact snapshot of an authenticated user.
+    """
+
+    id: str
+    user_type: str
+    username: str | None = None
+    email: str | None = None
+    wallet_address: str | None = None
+
+    @classmethod
+    def from_user(cls, user: User | Web3User) -> "Principal":
+        if isinstance(user, User):
+            return cls(
+                id=str(user.id),
+                user_type="default",
+                username=user.username,
+                email=user.email,
+            )
+        return cls(
+            id=str(user.id),
+            user_type="web3",
+            wallet_address=user.wallet_address,
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> "Principal":
+        return cls(
+            id=payload["sub"],
+            user_type=payload["user_type"],
+            username=payload.get("username"),
+            email=payload.get("email"),
+            wallet_address=payload.get("wallet"),
+        )
+
+
+class PrincipalCache:
+    """
+    Two-tier principal cache: an in-process TTL map (L1) in front of Redis (L2).
+
+    Nothing that writes users changes the fields a principal holds, so
+    entries are never invalidated; a change would show up once both TTLs
+    have run out (at most l1_ttl + l2_ttl seconds).
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        enabled: bool = True,
+        l1_ttl_seconds: float = 30,
+        l1_max_size: int = 10_000,
+        l2_ttl_seconds: int = 300,
+    ):
+        self._redis = redis
+        self.enabled = enabled
+        self.l1_ttl = l1_ttl_seconds
+        self.l1_max_size = l1_max_size
+        self.l2_ttl = l2_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @staticmethod
+    def key(user_type: str, sub: str) -> str:
+        return f"principal:{user_type}:{sub}"
+
+    def _get_local(self, key: str) -> Principal | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return principal
+
+    def _set_local(self, key: str, principal: Principal) -> None:
+        self._entries[key] = (time.monotonic() + self.l1_ttl, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.l1_max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, user_type: str, sub: str) -> Principal | None:
+        if not self.enabled:
+            return None
+        key = self.key(user_type, sub)
+        principal = self._get_local(key)
+        if principal is not None:
+            return principal
+        try:
+            cached = await self.redis.get(key)
+        except RedisError:
+            logger.warning("Principal cache read failed", exc_info=True)
+            return None
+        if cached is None:
+            return None
+        principal = Principal(**json.loads(cached))
+        self._set_local(key, principal)
+        return principal
+
+    async def set(self, principal: Principal) -> None:
+        if not self.enabled:
+            return
+        key = self.key(principal.user_type, principal.id)
+        self._set_local(key, principal)
+        try:
+            await self.redis.set(key, json.dumps(asdict(principal)), ex=self.l2_ttl)
+        except RedisError:
+            logger.warning("Principal cache write failed", exc_info=True)
+
+
+principal_cache = PrincipalCache(
+    enabled=config.principal_cache.enabled,
+    l1_ttl_seconds=config.principal_cache.l1_ttl_seconds,
+    l1_max_size=config.principal_cache.l1_max_size,
+    l2_ttl_seconds=config.principal_cache.l2_ttl_seconds,
+)
@@ -0,0 +1,193 @@
+import hashlib
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import get_env
+from src.core.metrics import RATE_LIMIT_REJECTIONS
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+# GCRA over every key at once: the request is only counted when all keys
+# allow it. Returns 0 when allowed, otherwise milliseconds until a retry.
+GCRA_SCRIPT = """
+local time = redis.call("TIME")
+local now = time[1] * 1000 + time[2] / 1000
+local new_tats = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local period = tonumber(ARGV[2 * i])
+    local tat = math.max(tonumber(redis.call("GET", key)) or now, now)
+    new_tats[i] = tat + interval
+    retry_after = math.max(retry_after, new_tats[i] - now - period)
+end
+if retry_after > 0 then
+    return math.ceil(retry_after)
+end
+for i, key in ipairs(KEYS) do
+    redis.call("SET", key, new_tats[i], "PX", math.ceil(new_tats[i] - now))
+end
+return 0
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class Limit:
+    count: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.count
+
+
+class LocalTokenBucket:
+    """
+    Per-process token buckets with the same rate as the shared limit.
+
+    A process that alone has used up a key's budget is over the global
+    limit too, so it can reject without asking Redis.
+    """
+
+    def __init__(self, max_keys: int = 10_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _tokens(self, key: str, limit: Limit, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (limit.count, now))
+        return min(limit.count, tokens + (now - updated) / limit.interval)
+
+    def _store(self, key: str, tokens: float, now: float) -> None:
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def peek(self, key: str, limit: Limit) -> float:
+        """
+        Returns 0 if a token is free, otherwise the seconds until one is.
+        """
+        tokens = self._tokens(key, limit, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) * limit.interval
+
+    def take(self, key: str, limit: Limit) -> float:
+        """
+        Takes a token and returns 0, or returns the seconds until one is free.
+        """
+        now = time.monotonic()
+        tokens = self._tokens(key, limit, now)
+        if tokens < 1:
+            return (1 - tokens) * limit.interval
+        self._store(key, tokens - 1, now)
+        return 0.0
+
+    def give_back(self, key: str, limit: Limit) -> None:
+        now = time.monotonic()
+        self._store(key, min(limit.count, self._tokens(key, limit, now) + 1), now)
+
+
+class RateLimiter:
+    """
+    Shared GCRA limits in Redis behind a local token-bucket pre-filter.
+
+    If Redis is unavailable only the local buckets are enforced.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        enabled: bool = True,
+        local_max_keys: int = 10_000,
+    ):
+        self._redis = redis
+        self.enabled = enabled
+        self.local = LocalTokenBucket(local_max_keys)
+        self._gcra = None
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @staticmethod
+    def _reject(scope: str, tier: str, retry_after: float) -> HTTPException:
+        RATE_LIMIT_REJECTIONS.labels(scope, tier).inc()
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, try again later",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
+
+    async def check(self, scope: str, limits: dict[str, Limit]) -> None:
+        if not self.enabled or not limits:
+            return
+        # Like the shared limit, only count the request when every key
+        # allows it.
+        if wait := max(self.local.peek(key, limit) for key, limit in limits.items()):
+            raise self._reject(scope, "local", wait)
+        for key, limit in limits.items():
+            self.local.take(key, limit)
+
+        if self._gcra is None:
+            self._gcra = self.redis.register_script(GCRA_SCRIPT)
+        args = []
+        for limit in limits.values():
+            args += [limit.interval * 1000, limit.period * 1000]
+        try:
+            retry_after_ms = await self._gcra(keys=list(limits), args=args)
+        except RedisError:
+            logger.warning("Rate limiter check failed", exc_info=True)
+            return
+        if retry_after_ms:
+            for key, limit in limits.items():
+                self.local.give_back(key, limit)
+            raise self._reject(scope, "redis", retry_after_ms / 1000)
+
+
+rate_limiter = RateLimiter(
+    enabled=config.rate_limit.enabled,
+    local_max_keys=config.rate_limit.local_max_keys,
+)
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(scope: str, identifier_field: str | None = None):
+    """
+    Dependency limiting a route per client IP and, when `identifier_field`
+    is given, per value of that JSON body field (e.g. the login email).
+
+    Runs before the route body, so rejected requests never reach bcrypt.
+    """
+    ip_limit = Limit(config.rate_limit.ip_limit, config.rate_limit.ip_period_seconds)
+    identifier_limit = Limit(
+        config.rate_limit.identifier_limit,
+        config.rate_limit.identifier_period_seconds,
+    )
+
+    async def dependency(request: Request) -> None:
+        limits = {f"ratelimit:{scope}:ip:{_client_ip(request)}": ip_limit}
+        if identifier_field is not None:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            identifier = body.get(identifier_field) if isinstance(body, dict) else None
+            if isinstance(identifier, str) and identifier:
+                digest = hashlib.sha256(identifier.strip().lower().encode()).hexdigest()
+                limits[f"ratelimit:{scope}:id:{digest}"] = identifier_limit
+        await rate_limiter.check(scope, limits)
+
+    return dependency
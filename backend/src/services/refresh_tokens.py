@@ -0,0 +1,103 @@
+import logging
+import time
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import get_env
+from src.db.redis import get_redis
+from src.schemas.auth import TokenPair
+from src.services.jwt_service import create_token_pair, decode_refresh_token
+from src.services.principals import Principal
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+# Returns 1 when the token was unused, 0 on reuse (and revokes the family),
+# -1 when the family was already revoked.
+USE_TOKEN_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    return -1
+end
+if redis.call("SET", KEYS[1], "1", "NX", "EX", ARGV[1]) then
+    return 1
+end
+redis.call("SET", KEYS[2], "1", "EX", ARGV[2])
+return 0
+"""
+
+
+class RefreshTokenStore:
+    """
+    Makes refresh tokens single use.
+
+    Used token ids are remembered until the token would have expired. A
+    used token presented again means it leaked, so its whole family (every
+    token rotated from the same login) is revoked.
+    """
+
+    def __init__(self, family_ttl_seconds: int, redis: Redis | None = None):
+        self.family_ttl = family_ttl_seconds
+        self._redis = redis
+        self._use_token = None
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @staticmethod
+    def _unavailable() -> HTTPException:
+        logger.warning("Refresh token store unavailable", exc_info=True)
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token refresh is temporarily unavailable",
+            headers={"Retry-After": "1"},
+        )
+
+    async def use(self, jti: str, family: str, expires_at: float) -> None:
+        if self._use_token is None:
+            self._use_token = self.redis.register_script(USE_TOKEN_SCRIPT)
+        ttl = max(int(expires_at - time.time()) + 1, 1)
+        try:
+            result = await self._use_token(
+                keys=[f"refresh:used:{jti}", f"refresh:revoked:{family}"],
+                args=[ttl, self.family_ttl],
+            )
+        except RedisError:
+            raise self._unavailable()
+        if result == 0:
+            logger.warning("Refresh token reuse detected, revoking family %s", family)
+        if result != 1:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked",
+            )
+
+    async def revoke_family(self, token: str) -> None:
+        payload = decode_refresh_token(token)
+        try:
+            await self.redis.set(
+                f"refresh:revoked:{payload['fam']}",
+                1,
+                ex=self.family_ttl,
+            )
+        except RedisError:
+            raise self._unavailable()
+
+    async def rotate(self, token: str, user_type: str) -> TokenPair:
+        payload = decode_refresh_token(token)
+        if payload.get("user_type") != user_type:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token",
+            )
+        await self.use(payload["jti"], payload["fam"], payload["exp"])
+        return create_token_pair(Principal.from_claims(payload), family=payload["fam"])
+
+
+refresh_token_store = RefreshTokenStore(
+    family_ttl_seconds=int(config.jwt.refresh_token_expire_minutes * 60),
+)
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import get_env
+from src.core.metrics import REVOCATION_CHECKS
+from src.db.redis import get_redis
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+INDEX_KEY = "revoked:index"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationList:
+    """
+    Revoked token ids, kept in Redis with a local Bloom filter in front.
+
+    Revocations are published so every worker running `listen()` adds them
+    to its filter; only ids the filter may contain are checked in Redis.
+    The filter is only trusted while subscribed: before the first load and
+    after losing the subscription, which would miss revocations, every
+    check goes to Redis, and the filter is rebuilt on reconnecting. Checks
+    that need Redis while it is down fail with 503 rather than treating
+    the token as revoked.
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        enabled: bool = True,
+        channel: str = "revocation:invalidate",
+        bloom_capacity: int = 100_000,
+        bloom_error_rate: float = 0.001,
+        rebuild_interval_seconds: float = 300,
+    ):
+        self._redis = redis
+        self.enabled = enabled
+        self.channel = channel
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.rebuild_interval = rebuild_interval_seconds
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self.loaded = False
+        self.subscribed = False
+
+    @property
+    def redis(self) -> Redis:
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @staticmethod
+    def key(jti: str) -> str:
+        return f"revoked:{jti}"
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        ttl = max(int(expires_at - now) + 1, 1)
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(self.key(jti), 1, ex=ttl)
+                pipe.zadd(INDEX_KEY, {jti: expires_at})
+                pipe.zremrangebyscore(INDEX_KEY, "-inf", now)
+                pipe.publish(self.channel, jti)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Token revocation failed", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token revocation is temporarily unavailable",
+                headers={"Retry-After": "1"},
+            )
+        self.bloom.add(jti)
+
+    async def is_revoked(self, jti: str | None) -> bool:
+        if not self.enabled or jti is None:
+            return False
+        if self.loaded and self.subscribed and jti not in self.bloom:
+            REVOCATION_CHECKS.labels("bloom_miss").inc()
+            return False
+        try:
+            revoked = bool(await self.redis.exists(self.key(jti)))
+        except RedisError:
+            # Unknown either way: don't let the token through, but don't
+            # report it revoked either, clients log users out on that.
+            logger.warning("Revocation check failed", exc_info=True)
+            REVOCATION_CHECKS.labels("unavailable").inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token verification is temporarily unavailable",
+                headers={"Retry-After": "1"},
+            )
+        REVOCATION_CHECKS.labels("revoked" if revoked else "not_revoked").inc()
+        return revoked
+
+    async def rebuild(self) -> None:
+        """
+        Replace the filter with one holding only unexpired revocations.
+        """
+        jtis = await self.redis.zrangebyscore(INDEX_KEY, time.time(), "+inf")
+        bloom = BloomFilter(
+            max(self.bloom_capacity, len(jtis) * 2),
+            self.bloom_error_rate,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        self.bloom = bloom
+        self.loaded = True
+
+    async def listen(self) -> None:
+        """
+        Keep the local filter in sync with other workers. Runs until cancelled.
+        """
+        if not self.enabled:
+            return
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    await self.rebuild()
+                    rebuilt_at = time.monotonic()
+                    self.subscribed = True
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=1.0,
+                        )
+                        if message is not None:
+                            self.bloom.add(message["data"])
+                        if time.monotonic() - rebuilt_at >= self.rebuild_interval:
+                            await self.rebuild()
+                            rebuilt_at = time.monotonic()
+            except RedisError:
+                self.subscribed = False
+                logger.warning("Revocation listener disconnected", exc_info=True)
+                await asyncio.sleep(1)
+
+
+revocation_list = RevocationList(
+    enabled=config.revocation.enabled,
+    channel=config.revocation.channel,
+    bloom_capacity=config.revocation.bloom_capacity,
+    bloom_error_rate=config.revocation.bloom_error_rate,
+    rebuild_interval_seconds=config.revocation.rebuild_interval_seconds,
+)
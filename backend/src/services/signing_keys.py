@@ -0,0 +1,228 @@
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from src.core.config import get_env, on_reload
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Any | None = None
+
+
+def _algorithm_for(public_key) -> str:
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return "RS256"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if isinstance(public_key.curve, ec.SECP256R1):
+            return "ES256"
+        raise ValueError(f"Unsupported EC curve {public_key.curve.name}")
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type {type(public_key).__name__}")
+
+
+def _public_jwk(key: SigningKey) -> dict:
+    algorithm = {"RS256": RSAAlgorithm, "ES256": ECAlgorithm, "EdDSA": OKPAlgorithm}
+    jwk = algorithm[key.algorithm].to_jwk(key.public_key, as_dict=True)
+    return {**jwk, "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+
+
+def load_key_file(path: Path) -> SigningKey:
+    data = path.read_bytes()
+    if b"PRIVATE KEY" in data:
+        private_key = serialization.load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key = None
+        public_key = serialization.load_pem_public_key(data)
+    return SigningKey(
+        kid=path.stem,
+        algorithm=_algorithm_for(public_key),
+        public_key=public_key,
+        private_key=private_key,
+    )
+
+
+class KeyRing:
+    """
+    Keys used to sign and verify tokens.
+
+    With `keys_dir` every `<kid>.pem` in it is loaded once and kept parsed.
+    Tokens are signed with the active key and carry it in the `kid`
+    header. The active key is `active_kid`, or else the greatest kid with
+    a private key whose file is at least `publish_delay_seconds` old: a new
+    key is served in the JWKS for that long before it signs, so services
+    caching the JWKS already know it. Any loaded key verifies, so rotating
+    means adding a new key, letting it become active, and deleting the old
+    file (or keeping just its public half) once its tokens have expired.
+    The directory is rescanned every `reload_interval_seconds`.
+
+    Without `keys_dir` tokens are signed with the shared HMAC secret.
+
+    Callbacks registered with `on_change` run whenever the keys or the
+    secret change.
+    """
+
+    def __init__(
+        self,
+        keys_dir: str | None = None,
+        active_kid: str | None = None,
+        secret_key: str | None = None,
+        algorithm: str = "HS256",
+        reload_interval_seconds: float = 60,
+        publish_delay_seconds: float = 300,
+    ):
+        self.keys_dir = Path(keys_dir) if keys_dir else None
+        self.active_kid = active_kid
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.reload_interval = reload_interval_seconds
+        self.publish_delay = publish_delay_seconds
+        self.keys: dict[str, SigningKey] = {}
+        self.signing_key: SigningKey | None = None
+        self._published_at: dict[str, float] = {}
+        self._jwks: dict = {"keys": []}
+        self._fingerprint: tuple | None = None
+        self._checked_at = 0.0
+        self._listeners: list[Callable[[], None]] = []
+        if self.keys_dir is None and not secret_key:
+            raise ValueError("Either jwt.keys_dir or jwt.secret_key must be set")
+
+    def on_change(self, callback: Callable[[], None]) -> None:
+        self._listeners.append(callback)
+
+    def _changed(self) -> None:
+        for callback in self._listeners:
+            callback()
+
+    def set_secret_key(self, secret_key: str | None) -> None:
+        if secret_key != self.secret_key:
+            self.secret_key = secret_key
+            self._changed()
+
+    @property
+    def asymmetric(self) -> bool:
+        return self.keys_dir is not None
+
+    def _scan(self) -> tuple:
+        return tuple(
+            (path.name, path.stat().st_mtime_ns)
+            for path in sorted(self.keys_dir.glob("*.pem"))
+        )
+
+    def _select(self, keys: dict[str, SigningKey]) -> SigningKey:
+        signable = sorted(kid for kid, key in keys.items() if key.private_key)
+        if self.active_kid:
+            if self.active_kid not in signable:
+                raise ValueError(f"No private key for active kid {self.active_kid!r}")
+            return keys[self.active_kid]
+        if not signable:
+            raise ValueError("No private signing key found")
+        published_before = time.time() - self.publish_delay
+        ready = [kid for kid in signable if self._published_at[kid] <= published_before]
+        if ready:
+            return keys[ready[-1]]
+        # Nothing has been published long enough (e.g. the first key ever):
+        # use the one published first.
+        return keys[min(signable, key=lambda kid: (self._published_at[kid], kid))]
+
+    def load(self) -> None:
+        fingerprint = self._scan()
+        paths = list(self.keys_dir.glob("*.pem"))
+        keys = {path.stem: load_key_file(path) for path in paths}
+        published_at = self._published_at
+        # A key file's mtime is when it was published.
+        self._published_at = {path.stem: path.stat().st_mtime for path in paths}
+        try:
+            signing_key = self._select(keys)
+        except ValueError:
+            self._published_at = published_at
+            raise
+        self.keys = keys
+        self.signing_key = signing_key
+        self._jwks = {"keys": [_public_jwk(key) for key in keys.values()]}
+        changed = self._fingerprint is not None
+        self._fingerprint = fingerprint
+        if changed:
+            self._changed()
+
+    def _maybe_reload(self) -> None:
+        if not self.asymmetric:
+            return
+        now = time.monotonic()
+        if self._fingerprint is None:
+            self.load()
+        elif now - self._checked_at >= self.reload_interval:
+            try:
+                if self._scan() != self._fingerprint:
+                    self.load()
+                else:
+                    # A pending key may have been published long enough.
+                    self.signing_key = self._select(self.keys)
+            except (OSError, ValueError):
+                logger.exception("Reloading signing keys failed, keeping old keys")
+        else:
+            return
+        self._checked_at = now
+
+    def encode(self, payload: dict) -> str:
+        self._maybe_reload()
+        if not self.asymmetric:
+            return jwt.encode(payload, self.secret_key, algorithm=self.algorithm)
+        key = self.signing_key
+        return jwt.encode(
+            payload,
+            key.private_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid},
+        )
+
+    def decode(self, token: str, **options) -> dict:
+        self._maybe_reload()
+        if not self.asymmetric:
+            return jwt.decode(
+                token, self.secret_key, algorithms=[self.algorithm], **options
+            )
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        return jwt.decode(token, key.public_key, algorithms=[key.algorithm], **options)
+
+    def jwks(self) -> dict:
+        self._maybe_reload()
+        return self._jwks
+
+
+key_ring = KeyRing(
+    keys_dir=config.jwt.keys_dir,
+    active_kid=config.jwt.active_kid,
+    secret_key=config.jwt.secret_key,
+    algorithm=config.jwt.algorithm,
+    reload_interval_seconds=config.jwt.keys_reload_interval_seconds,
+    publish_delay_seconds=(
+        config.jwt.jwks_max_age_seconds
+        if config.jwt.key_publish_delay_seconds is None
+        else config.jwt.key_publish_delay_seconds
+    ),
+)
+
+
+@on_reload
+def _reload_secret_key() -> None:
+    key_ring.set_secret_key(config.jwt.secret_key)
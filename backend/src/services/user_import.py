@@ -0,0 +1,337 @@
+import asyncio
+import codecs
+import csv
+import json
+import os
+import re
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from typing import BinaryIO
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.core.wallets import wallet_from_bytes, wallet_to_bytes
+from src.services.hashing import PasswordHasher
+
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+MAX_REPORTED_ERRORS = 1000
+# How long to back off when the password hasher is at max_pending.
+HASHER_BUSY_RETRY_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class ImportTable:
+    name: str
+    columns: tuple[str, ...]
+    key: str
+
+
+TABLES = {
+    "users": ImportTable(
+        name="users",
+        columns=("id", "username", "email", "hashed_password"),
+        key="email",
+    ),
+    "web3_users": ImportTable(
+        name="web3_users",
+        columns=("id", "wallet_address_bytes", "nonce"),
+        key="wallet_address_bytes",
+    ),
+}
+
+
+def _display_key(key: str | bytes) -> str:
+    return wallet_from_bytes(key) if isinstance(key, bytes) else key
+
+
+@dataclass
+class ImportReport:
+    table: str
+    processed: int = 0
+    inserted: int = 0
+    conflicts: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    conflict_count: int = 0
+    error_count: int = 0
+
+    def add_conflicts(self, count: int, keys: Iterable[str]) -> None:
+        self.conflict_count += count
+        for key in keys:
+            if len(self.conflicts) >= MAX_REPORTED_ERRORS:
+                break
+            self.conflicts.append(key)
+
+    def add_error(self, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def progress(self) -> dict:
+        return {
+            "table": self.table,
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "conflicts": self.conflict_count,
+            "errors": self.error_count,
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            **self.progress(),
+            "conflicting_keys": self.conflicts,
+            "error_details": self.errors,
+        }
+
+
+async def iter_file_chunks(
+    file: BinaryIO,
+    size: int = 64 * 1024,
+) -> AsyncIterator[bytes]:
+    while chunk := file.read(size):
+        yield chunk
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # Chunk boundaries can fall inside a multi-byte character.
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+async def parse_rows(
+    lines: AsyncIterable[str],
+    fmt: str,
+) -> AsyncIterator[tuple[int, dict | None]]:
+    """
+    Yields (line number, row) pairs. Rows that cannot be parsed are None.
+
+    CSV input needs a header line; quoted fields spanning lines are not
+    supported.
+    """
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        line = line.rstrip("\r")
+        if not line.strip():
+            continue
+        try:
+            if fmt == "jsonl":
+                yield line_number, json.loads(line)
+            elif header is None:
+                header = next(csv.reader([line]))
+            else:
+                yield line_number, dict(zip(header, next(csv.reader([line]))))
+        except (ValueError, StopIteration):
+            yield line_number, None
+
+
+class UserImporter:
+    """
+    Loads users in chunks: passwords are hashed in a worker pool, rows are
+    COPYed into a temporary staging table and merged with
+    INSERT ... ON CONFLICT DO NOTHING so existing users are reported, not
+    overwritten.
+
+    Passwords are hashed with `hasher` when given (the app passes its
+    password hasher), otherwise with a process-pool hasher of `workers`
+    owned by the importer. At most `workers` hashes are in flight, and the
+    import backs off while the hasher is at its `max_pending` limit.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        table: str = "users",
+        chunk_size: int = 5000,
+        workers: int | None = None,
+        hasher: PasswordHasher | None = None,
+    ):
+        self.engine = engine
+        self.table = TABLES[table]
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self._hasher = hasher
+        self._owns_hasher = False
+
+    async def __aenter__(self) -> "UserImporter":
+        if self.table.name == "users" and self._hasher is None:
+            self._hasher = PasswordHasher(
+                executor="process",
+                max_workers=self.workers,
+                max_pending=self.workers,
+            )
+            self._owns_hasher = True
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._owns_hasher:
+            self._hasher.shutdown()
+            self._hasher = None
+            self._owns_hasher = False
+
+    async def _hash_password(self, password: str) -> str:
+        while True:
+            try:
+                return await self._hasher.hash(password)
+            except HTTPException as error:
+                if error.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                    raise
+            await asyncio.sleep(HASHER_BUSY_RETRY_SECONDS)
+
+    async def _hash_passwords(self, passwords: list[str]) -> list[str]:
+        # Submitted `workers` at a time, so a shared hasher keeps serving
+        # logins between waves.
+        hashes = []
+        for start in range(0, len(passwords), self.workers):
+            hashes += await asyncio.gather(
+                *(
+                    self._hash_password(password)
+                    for password in passwords[start : start + self.workers]
+                )
+            )
+        return hashes
+
+    def _drop_duplicates(
+        self,
+        records: list[tuple],
+        report: ImportReport,
+    ) -> list[tuple]:
+        """
+        Keeps the first record per key; the others are reported as conflicts.
+        """
+        key_index = self.table.columns.index(self.table.key)
+        unique: dict = {}
+        duplicates = []
+        for record in records:
+            key = record[key_index]
+            if key in unique:
+                duplicates.append(key)
+            else:
+                unique[key] = record
+        report.add_conflicts(len(duplicates), map(_display_key, duplicates))
+        return list(unique.values())
+
+    async def _prepare(
+        self,
+        rows: list[tuple[int, dict | None]],
+        report: ImportReport,
+    ) -> list[tuple]:
+        records = []
+        passwords: dict[UUID, str] = {}
+        for line_number, row in rows:
+            if row is None:
+                report.add_error(f"line {line_number}: malformed row")
+                continue
+            if self.table.name == "web3_users":
+                wallet = row.get("wallet_address") or row.get("wallet")
+                if not wallet:
+                    report.add_error(f"line {line_number}: missing wallet_address")
+                    continue
+                try:
+                    records.append((uuid4(), wallet_to_bytes(wallet), ""))
+                except ValueError:
+                    report.add_error(f"line {line_number}: invalid wallet_address")
+                continue
+
+            username, email = row.get("username"), row.get("email")
+            hashed_password = row.get("hashed_password")
+            if not username or not email:
+                report.add_error(f"line {line_number}: missing username or email")
+            elif hashed_password:
+                if not BCRYPT_HASH.match(hashed_password):
+                    report.add_error(f"line {line_number}: invalid bcrypt hash")
+                    continue
+                records.append((uuid4(), username, email, hashed_password))
+            elif row.get("password"):
+                user_id = uuid4()
+                passwords[user_id] = row["password"]
+                records.append((user_id, username, email, None))
+            else:
+                report.add_error(f"line {line_number}: missing password")
+
+        # Deduplicated first so repeated rows are not hashed for nothing.
+        records = self._drop_duplicates(records, report)
+        if passwords:
+            to_hash = [i for i, record in enumerate(records) if record[3] is None]
+            hashes = await self._hash_passwords(
+                [passwords[records[i][0]] for i in to_hash]
+            )
+            for i, hashed_password in zip(to_hash, hashes):
+                records[i] = (*records[i][:3], hashed_password)
+        return records
+
+    async def _load(self, records: list[tuple]) -> tuple[int, list[str]]:
+        """
+        Merges records, which must have unique keys, into the target table.
+        Returns the number of inserted rows and the keys of rows skipped
+        because of a conflict.
+        """
+        table = self.table
+        columns = ", ".join(table.columns)
+        staging = f"staging_{table.name}"
+        async with self.engine.connect() as connection:
+            raw_connection = await connection.get_raw_connection()
+            driver = raw_connection.driver_connection
+            async with driver.transaction():
+                await driver.execute(
+                    f"CREATE TEMP TABLE {staging} "
+                    f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+                await driver.copy_records_to_table(
+                    staging,
+                    records=records,
+                    columns=table.columns,
+                )
+                inserted = await driver.fetch(
+                    f"INSERT INTO {table.name} ({columns}) "
+                    f"SELECT {columns} FROM {staging} "
+                    f"ON CONFLICT DO NOTHING RETURNING {table.key}"
+                )
+        key_index = table.columns.index(table.key)
+        inserted_keys = {row[table.key] for row in inserted}
+        return len(inserted), [
+            record[key_index]
+            for record in records
+            if record[key_index] not in inserted_keys
+        ]
+
+    async def _process(
+        self,
+        rows: list[tuple[int, dict | None]],
+        report: ImportReport,
+    ) -> None:
+        report.processed += len(rows)
+        records = await self._prepare(rows, report)
+        if records:
+            inserted, conflicts = await self._load(records)
+            report.inserted += inserted
+            report.add_conflicts(len(conflicts), map(_display_key, conflicts))
+
+    async def run(
+        self,
+        rows: AsyncIterable[tuple[int, dict | None]],
+    ) -> AsyncIterator[ImportReport]:
+        """
+        Imports all rows, yielding the running report after every chunk.
+        """
+        report = ImportReport(table=self.table.name)
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                await self._process(chunk, report)
+                chunk = []
+                yield report
+        if chunk:
+            await self._process(chunk, report)
+            yield report
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+
+from src.core.config import get_env
+from src.core.metrics import APP_READY, WARMUP_STEP_SECONDS
+from src.db.redis import get_binary_redis, get_redis
+from src.db.session import warm_up_engine
+from src.services.hashing import password_hasher
+from src.services.signing_keys import key_ring
+from src.services.web3_auth import signature_recoverer
+
+logger = logging.getLogger(__name__)
+config = get_env()
+
+# Signed by a throwaway key; recovering it imports eth_account in the pool.
+WARM_UP_MESSAGE = "warm-up"
+WARM_UP_SIGNATURE = (
+    "0x026d37ebaf95d888a9cb4bdaf68e7736396cb1ee7e7f65658af0269384678654"
+    "624bf90c79c32844b879ac0bac9ab2ef6d3e4abeb0f223f8fb36ace77a596a471c"
+)
+WARM_UP_ADDRESS = "0xe6e136589ca3032810a3d2a6f1d6dcb632688dde"
+
+
+class WarmUp:
+    """
+    Pays the first-request costs before the worker counts as ready.
+
+    Opens pool connections, connects to Redis, runs one bcrypt hash and one
+    ecrecover in their pools and loads the signing keys. Failed steps are
+    retried until all succeed; `ready` stays False until then and goes back
+    to False at shutdown.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        db_connections: int = 5,
+        step_timeout_seconds: float = 10,
+        retry_interval_seconds: float = 2,
+    ):
+        self.enabled = enabled
+        self.db_connections = db_connections
+        self.step_timeout = step_timeout_seconds
+        self.retry_interval = retry_interval_seconds
+        self.steps = {
+            "database": self._database,
+            "redis": self._redis,
+            "bcrypt": self._bcrypt,
+            "ecrecover": self._ecrecover,
+            "jwt": self._jwt,
+        }
+        self.checks = {name: "pending" for name in self.steps}
+        self._ready = False
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    @ready.setter
+    def ready(self, value: bool) -> None:
+        self._ready = value
+        APP_READY.set(int(value))
+
+    async def _database(self) -> None:
+        await warm_up_engine(self.db_connections)
+
+    async def _redis(self) -> None:
+        await get_redis().ping()
+        await get_binary_redis().ping()
+
+    async def _bcrypt(self) -> None:
+        await password_hasher.hash(WARM_UP_MESSAGE)
+
+    async def _ecrecover(self) -> None:
+        address = await signature_recoverer.recover(WARM_UP_MESSAGE, WARM_UP_SIGNATURE)
+        if address is None or address.lower() != WARM_UP_ADDRESS:
+            raise RuntimeError("ecrecover returned the wrong address")
+
+    async def _jwt(self) -> None:
+        key_ring.decode(key_ring.encode({"sub": WARM_UP_MESSAGE}))
+
+    async def _run_step(self, name: str) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.steps[name](), self.step_timeout)
+        except Exception as e:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+            self.checks[name] = f"failed: {type(e).__name__}"
+            return False
+        WARMUP_STEP_SECONDS.labels(name).set(time.perf_counter() - started)
+        self.checks[name] = "ok"
+        return True
+
+    async def run(self) -> None:
+        if not self.enabled:
+            self.checks = {name: "skipped" for name in self.steps}
+            self.ready = True
+            return
+        pending = list(self.steps)
+        while True:
+            results = await asyncio.gather(*map(self._run_step, pending))
+            pending = [name for name, ok in zip(pending, results) if not ok]
+            if not pending:
+                break
+            await asyncio.sleep(self.retry_interval)
+        self.ready = True
+        logger.info("Warm-up finished, worker is ready")
+
+
+warm_up = WarmUp(
+    enabled=config.warmup.enabled,
+    db_connections=config.warmup.db_connections or config.db.pool_size,
+    step_timeout_seconds=config.warmup.step_timeout_seconds,
+    retry_interval_seconds=config.warmup.retry_interval_seconds,
+)
@@ -1,48 +1,246 @@
-import secrets
-import string
+import asyncio
+import os
+from uuid import uuid4
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 
 from fastapi import status
 from fastapi.exceptions import HTTPException
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from eth_account import Account
-from eth_account.messages import encode_defunct
-
+from src.core.config import get_env
+from src.core.metrics import CRYPTO_LATENCY, track_latency
 from src.services.jwt_service import create_token_pair
+from src.services.nonce_store import nonce_store
 from src.db.models import Web3User
+from src.db.repositories.loaders import web3_user_loader
+from src.schemas.auth import TokenPair, Web3BatchLoginResult, Web3LoginRequest
+
+config = get_env()
+
+
+def recover_address(message: str, signature: str) -> str | None:
+    # eth_account takes about a second to import, keep it off the startup path.
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+
+    try:
+        # EIP-191 encoding
+        encoded_message = encode_defunct(text=message)
+        return Account.recover_message(encoded_message, signature=signature)
+    except Exception:
+        return None
+
+
+def recover_addresses(items: list[tuple[str, str]]) -> list[str | None]:
+    return [recover_address(message, signature) for message, signature in items]
+
+
+class SignatureRecoverer:
+    """
+    Runs ecrecover in a worker pool instead of on the event loop.
+
+    In "batch" mode recoveries arriving within `batch_window_ms` are
+    collected and verified together in a single worker call.
+    """
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        max_workers: int | None = None,
+        mode: str = "executor",
+        batch_window_ms: float = 2,
+        max_batch_size: int = 64,
+    ):
+        self.executor_type = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mode = mode
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._executor: Executor | None = None
+        self._batch: list[tuple[str, str, asyncio.Future]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="ecrecover",
+                )
+        return self._executor
+
+    async def recover(self, message: str, signature: str) -> str | None:
+        with track_latency(CRYPTO_LATENCY, "ecrecover"):
+            if self.mode == "batch":
+                return await self._enqueue(message, signature)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.executor,
+                recover_address,
+                message,
+                signature,
+            )
+
+    async def recover_many(self, items: list[tuple[str, str]]) -> list[str | None]:
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        with track_latency(CRYPTO_LATENCY, "ecrecover_batch"):
+            return await loop.run_in_executor(self.executor, recover_addresses, items)
+
+    def _enqueue(self, message: str, signature: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((message, signature, future))
+        if len(self._batch) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._batch = self._batch, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list[tuple[str, str, asyncio.Future]]):
+        try:
+            results = await self.recover_many(
+                [(message, signature) for message, signature, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
 
-def create_nonce(length: int = 24) -> str:
-    alphabet = string.ascii_letters + string.digits
-    return "".join(secrets.choice(alphabet) for _ in range(length))
+signature_recoverer = SignatureRecoverer(
+    executor=config.web3.executor,
+    max_workers=config.web3.max_workers,
+    mode=config.web3.recovery_mode,
+    batch_window_ms=config.web3.batch_window_ms,
+    max_batch_size=config.web3.max_batch_size,
+)
+
+
+def _address_matches(recovered: str | None, expected_address: str) -> bool:
+    # expected_address is already normalized to lowercase by the schema
+    return recovered is not None and recovered.lower() == expected_address
+
+
+async def _get_or_create_users(
+    wallets: dict[str, str],
+    session: AsyncSession,
+) -> dict[str, Web3User]:
+    """
+    Loads web3 users by wallet, creating rows for wallets signing in for
+    the first time. `wallets` maps each address to the nonce it signed.
+    """
+    found = await web3_user_loader.load_many(wallets)
+    users = {user.wallet_address: user for user in found if user is not None}
+    missing = [wallet for wallet in wallets if wallet not in users]
+    if not missing:
+        return users
+
+    statement = (
+        insert(Web3User)
+        .values(
+            [
+                {"id": uuid4(), "wallet_address": wallet, "nonce": wallets[wallet]}
+                for wallet in missing
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=[Web3User.wallet_address])
+    )
+    await session.execute(statement)
+    await session.commit()
+    result = await session.scalars(
+        select(Web3User).where(Web3User.wallet_address.in_(missing))
+    )
+    users.update({user.wallet_address: user for user in result})
+    return users
 
 
 async def verify_signature(
     signature: str,
     expected_address: str,
+    nonce: str,
     session: AsyncSession,
-) -> bool:
-    user = await session.scalar(
-        select(Web3User).where(Web3User.wallet_address == expected_address)
-    )
-    if not user:
+) -> TokenPair:
+    if not await nonce_store.consume(expected_address, nonce):
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired nonce",
         )
-    try:
-        # EIP-191 encoding
-        encoded_message = encode_defunct(text=user.nonce)
-        recovered_address = Account.recover_message(
-            encoded_message,
-            signature=signature,
-        )
-        # Compare lowercase to avoid checksum issues
-        if recovered_address.lower() == expected_address.lower():
-            return create_token_pair(user)
-    except Exception as e:
+    recovered_address = await signature_recoverer.recover(nonce, signature)
+    if not _address_matches(recovered_address, expected_address):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=e,
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature",
+        )
+    users = await _get_or_create_users({expected_address: nonce}, session)
+    return create_token_pair(users[expected_address])
+
+
+async def verify_signatures(
+    items: list[Web3LoginRequest],
+    session: AsyncSession,
+) -> list[Web3BatchLoginResult]:
+    consumed = await nonce_store.consume_many(
+        [(item.address, item.nonce) for item in items]
+    )
+    to_recover = [index for index, matched in enumerate(consumed) if matched]
+    recovered = await signature_recoverer.recover_many(
+        [(items[index].nonce, items[index].signature) for index in to_recover]
+    )
+    verified = {
+        index
+        for index, address in zip(to_recover, recovered)
+        if _address_matches(address, items[index].address)
+    }
+    users = {}
+    if verified:
+        users = await _get_or_create_users(
+            {items[index].address: items[index].nonce for index in verified},
+            session,
         )
+
+    results = []
+    for index, item in enumerate(items):
+        if index in verified:
+            result = Web3BatchLoginResult.model_construct(
+                address=item.address,
+                valid=True,
+                tokens=create_token_pair(users[item.address]),
+            )
+        elif index in to_recover:
+            result = Web3BatchLoginResult.model_construct(
+                address=item.address,
+                valid=False,
+                detail="Invalid signature",
+            )
+        else:
+            result = Web3BatchLoginResult.model_construct(
+                address=item.address,
+                valid=False,
+                detail="Invalid or expired nonce",
+            )
+        results.append(result)
+    return results
@@ -0,0 +1,64 @@
+"""
+Tests run against the same local stand-ins as the benchmarks: a throwaway
+SQLite database and fakeredis (see benchmarks/harness.py).
+"""
+
+import tempfile
+import uuid
+from pathlib import Path
+
+import pytest
+
+from benchmarks.harness import (
+    benchmark_client,
+    configure_environment,
+    install_fake_redis,
+)
+
+# Config is read when `src` is first imported, so this has to come before
+# any test module imports from it.
+DATABASE_URL = (
+    f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp(prefix='fastapi-tests-')) / 'db'}"
+)
+configure_environment(DATABASE_URL)
+install_fake_redis()
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def client():
+    async with benchmark_client(DATABASE_URL) as client:
+        yield client
+
+
+@pytest.fixture
+def fake_redis():
+    from fakeredis.aioredis import FakeRedis
+
+    return FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+async def tokens(client) -> dict:
+    """
+    Token pair of a freshly registered user.
+    """
+    name = uuid.uuid4().hex[:12]
+    response = await client.post(
+        "/api/auth/jwt/register",
+        json={
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": "correct-horse-battery",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from src.services import hashing
+from src.services.hashing import PasswordHasher, calibrate_bcrypt_rounds
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=1, max_pending=1)
+    yield hasher
+    hasher.shutdown()
+
+
+@pytest.fixture
+def fake_timings(monkeypatch):
+    """
+    bcrypt taking 1 ms at 4 rounds, doubling with every extra round.
+    """
+    monkeypatch.setattr(
+        hashing, "_time_hash", lambda rounds, samples=1: 0.001 * 2 ** (rounds - 4)
+    )
+
+
+async def test_calls_beyond_max_pending_are_rejected(hasher, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(
+        hashing, "hash_password", lambda password, rounds=None: release.wait(5)
+    )
+    first = asyncio.create_task(hasher.hash("first"))
+    await asyncio.sleep(0)
+    assert hasher.pending == 1
+
+    with pytest.raises(HTTPException) as error:
+        await hasher.hash("second")
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+    release.set()
+    await first
+    assert hasher.pending == 0
+    assert await hasher.hash("third")
+
+
+@pytest.mark.parametrize(
+    ("target_ms", "rounds"),
+    [(0.5, 4), (1, 4), (3, 5), (4, 6), (1000, 8)],
+)
+def test_calibration_picks_the_highest_cost_within_target(
+    fake_timings, target_ms, rounds
+):
+    assert calibrate_bcrypt_rounds(target_ms, min_rounds=4, max_rounds=8)[0] == rounds
+
+
+async def test_calibrated_rounds_are_used_for_new_hashes(hasher, fake_timings):
+    assert await hasher.calibrate(4, min_rounds=4, max_rounds=8) == 6
+
+    hashed = await hasher.hash("correct-horse-battery")
+
+    assert hashed.startswith("$2b$06$")
+    assert await hasher.verify("correct-horse-battery", hashed)
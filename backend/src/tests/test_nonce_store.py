@@ -0,0 +1,108 @@
+import pytest
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+from src.services.nonce_store import InMemoryNonceStore, RedisNonceStore
+
+pytestmark = pytest.mark.anyio
+
+WALLET = "0x" + "ab" * 20
+OTHER_WALLET = "0x" + "cd" * 20
+
+
+@pytest.fixture(params=["memory", "redis"])
+def store(request, fake_redis):
+    if request.param == "memory":
+        return InMemoryNonceStore(ttl_seconds=60)
+    return RedisNonceStore(ttl_seconds=60, redis=fake_redis)
+
+
+async def test_nonce_is_single_use(store):
+    await store.issue(WALLET, "first")
+
+    assert await store.consume(WALLET, "first")
+    assert not await store.consume(WALLET, "first")
+
+
+async def test_wrong_nonce_does_not_burn_the_stored_one(store):
+    await store.issue(WALLET, "right")
+
+    assert not await store.consume(WALLET, "wrong")
+    assert await store.consume(WALLET, "right")
+
+
+async def test_reissuing_replaces_the_nonce(store):
+    await store.issue(WALLET, "first")
+    await store.issue(WALLET, "second")
+
+    assert not await store.consume(WALLET, "first")
+    assert await store.consume(WALLET, "second")
+
+
+async def test_wallet_case_does_not_matter(store):
+    await store.issue(WALLET.upper().replace("0X", "0x"), "nonce")
+
+    assert await store.consume(WALLET, "nonce")
+
+
+async def test_consume_many(store):
+    await store.issue(WALLET, "one")
+    await store.issue(OTHER_WALLET, "two")
+
+    assert await store.consume_many(
+        [(WALLET, "one"), (OTHER_WALLET, "wrong"), ("0x" + "00" * 20, "three")]
+    ) == [True, False, False]
+    assert await store.consume_many([(WALLET, "one"), (OTHER_WALLET, "two")]) == [
+        False,
+        True,
+    ]
+
+
+async def test_expired_nonce_is_rejected():
+    store = InMemoryNonceStore(ttl_seconds=0)
+    await store.issue(WALLET, "nonce")
+
+    assert not await store.consume(WALLET, "nonce")
+
+
+async def test_signed_nonce_logs_in_once(client):
+    wallet = Account.create()
+    response = await client.post(
+        "/api/auth/web3/get_nonce",
+        json={"wallet": wallet.address},
+    )
+    nonce = response.json()["nonce"]
+    signature = wallet.sign_message(encode_defunct(text=nonce)).signature
+    login = {
+        "nonce": nonce,
+        "address": wallet.address,
+        "signature": signature.to_0x_hex(),
+    }
+
+    first = await client.post("/api/auth/web3/login", json=login)
+    replay = await client.post("/api/auth/web3/login", json=login)
+
+    assert first.status_code == 200
+    assert replay.status_code == 401
+    assert replay.json()["detail"] == "Invalid or expired nonce"
+
+
+async def test_wrong_nonce_does_not_lock_the_owner_out(client):
+    wallet = Account.create()
+    response = await client.post(
+        "/api/auth/web3/get_nonce",
+        json={"wallet": wallet.address},
+    )
+    nonce = response.json()["nonce"]
+    signature = wallet.sign_message(encode_defunct(text=nonce)).signature
+    login = {
+        "nonce": nonce,
+        "address": wallet.address,
+        "signature": signature.to_0x_hex(),
+    }
+
+    guess = await client.post("/api/auth/web3/login", json={**login, "nonce": "x"})
+    owner = await client.post("/api/auth/web3/login", json=login)
+
+    assert guess.status_code == 401
+    assert owner.status_code == 200
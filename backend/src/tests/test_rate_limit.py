@@ -0,0 +1,128 @@
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import HTTPException
+
+from src.services.rate_limit import Limit, LocalTokenBucket, RateLimiter
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+def make_worker(server):
+    """
+    Rate limiters sharing one Redis, like separate worker processes.
+    """
+
+    def make_worker() -> RateLimiter:
+        return RateLimiter(redis=FakeRedis(server=server, decode_responses=True))
+
+    return make_worker
+
+
+async def allowed(limiter: RateLimiter, limits: dict[str, Limit]) -> bool:
+    try:
+        await limiter.check("test", limits)
+    except HTTPException as error:
+        assert error.status_code == 429
+        assert int(error.headers["Retry-After"]) >= 1
+        return False
+    return True
+
+
+def test_local_bucket_refills_at_the_limit_rate(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr("src.services.rate_limit.time.monotonic", lambda: now)
+    bucket = LocalTokenBucket()
+    limit = Limit(count=2, period=10)
+
+    assert bucket.take("key", limit) == 0
+    assert bucket.take("key", limit) == 0
+    assert bucket.take("key", limit) == pytest.approx(5)
+
+    now += 5
+    assert bucket.take("key", limit) == 0
+
+
+async def test_limit_is_shared_between_workers(make_worker):
+    limits = {"ratelimit:test:ip:1": Limit(count=3, period=60)}
+    first, second = make_worker(), make_worker()
+
+    assert await allowed(first, limits)
+    assert await allowed(first, limits)
+    assert await allowed(second, limits)
+    # `second` has local budget left, the shared limit is used up.
+    assert not await allowed(second, limits)
+
+
+async def test_rejected_requests_do_not_count_against_other_keys(make_worker):
+    ip = {"ratelimit:test:ip:1": Limit(count=3, period=60)}
+    identifier = {"ratelimit:test:id:victim": Limit(count=1, period=60)}
+    first, second = make_worker(), make_worker()
+
+    assert await allowed(first, ip | identifier)
+    assert not await allowed(second, ip | identifier)
+
+    # Only the allowed request used up the IP budget.
+    assert await allowed(second, ip)
+    assert await allowed(second, ip)
+    assert not await allowed(second, ip)
+
+
+async def test_local_rejection_does_not_spend_other_keys(make_worker):
+    limiter = make_worker()
+    ip = {"ratelimit:test:ip:1": Limit(count=2, period=60)}
+    identifier = {"ratelimit:test:id:victim": Limit(count=1, period=60)}
+
+    assert await allowed(limiter, ip | identifier)
+    for _ in range(3):
+        assert not await allowed(limiter, ip | identifier)
+
+    # Redis has charged the IP once, so has the local bucket.
+    assert await allowed(limiter, ip)
+    assert not await allowed(limiter, ip)
+
+
+async def test_redis_rejection_gives_local_tokens_back(make_worker):
+    first, second = make_worker(), make_worker()
+    ip = {"ratelimit:test:ip:1": Limit(count=2, period=60)}
+    identifier = {"ratelimit:test:id:victim": Limit(count=1, period=60)}
+
+    assert await allowed(first, identifier)
+    # Rejected by the shared identifier limit, not by `second`'s buckets.
+    assert not await allowed(second, ip | identifier)
+
+    assert await allowed(second, ip)
+    assert await allowed(second, ip)
+    assert not await allowed(second, ip)
+
+
+async def test_keys_are_limited_independently(make_worker):
+    limiter = make_worker()
+    limit = Limit(count=1, period=60)
+
+    assert await allowed(limiter, {"ratelimit:test:ip:1": limit})
+    assert await allowed(limiter, {"ratelimit:test:ip:2": limit})
+    assert not await allowed(limiter, {"ratelimit:test:ip:1": limit})
+
+
+async def test_local_limit_still_applies_without_redis(server, make_worker):
+    limiter = make_worker()
+    limits = {"ratelimit:test:ip:1": Limit(count=2, period=60)}
+    server.connected = False
+
+    assert await allowed(limiter, limits)
+    assert await allowed(limiter, limits)
+    assert not await allowed(limiter, limits)
+
+
+async def test_disabled_limiter_allows_everything():
+    limiter = RateLimiter(enabled=False)
+    limits = {"ratelimit:test:ip:1": Limit(count=1, period=60)}
+
+    assert all([await allowed(limiter, limits) for _ in range(5)])
@@ -0,0 +1,70 @@
+import pytest
+
+from conftest import bearer
+
+pytestmark = pytest.mark.anyio
+
+
+async def refresh(client, refresh_token: str, path: str = "/api/auth/jwt/refresh"):
+    return await client.post(path, json={"refresh_token": refresh_token})
+
+
+async def test_refresh_rotates_the_pair(client, tokens):
+    response = await refresh(client, tokens["refresh_token"])
+
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    me = await client.get("/api/users/me", headers=bearer(rotated["access_token"]))
+    assert me.status_code == 200
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 200
+
+
+async def test_reused_refresh_token_revokes_its_family(client, tokens):
+    rotated = (await refresh(client, tokens["refresh_token"])).json()
+
+    reuse = await refresh(client, tokens["refresh_token"])
+
+    assert reuse.status_code == 401
+    assert reuse.json()["detail"] == "Refresh token has been revoked"
+    # The legitimate holder's newer token dies with the family.
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 401
+
+
+async def test_other_logins_are_not_affected(client, tokens):
+    me = await client.get("/api/users/me", headers=bearer(tokens["access_token"]))
+    login = await client.post(
+        "/api/auth/jwt/login",
+        json={"identifier": me.json()["email"], "password": "correct-horse-battery"},
+    )
+    await refresh(client, tokens["refresh_token"])
+    await refresh(client, tokens["refresh_token"])
+
+    assert (await refresh(client, login.json()["refresh_token"])).status_code == 200
+
+
+async def test_logout_revokes_the_refresh_family(client, tokens):
+    response = await client.post(
+        "/api/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers=bearer(tokens["access_token"]),
+    )
+
+    assert response.status_code == 204
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+async def test_access_token_is_not_a_refresh_token(client, tokens):
+    response = await refresh(client, tokens["access_token"])
+
+    assert response.status_code == 401
+
+
+async def test_refresh_token_only_works_for_its_user_type(client, tokens):
+    response = await refresh(
+        client,
+        tokens["refresh_token"],
+        path="/api/auth/web3/refresh",
+    )
+
+    assert response.status_code == 401
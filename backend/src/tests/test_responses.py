@@ -0,0 +1,130 @@
+import uuid
+
+import pytest
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from conftest import bearer
+from src.core.responses import conditional_response, etag_matches, make_etag
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(if_none_match: str | None = None) -> Request:
+    headers = []
+    if if_none_match is not None:
+        headers.append((b"if-none-match", if_none_match.encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "matches"),
+    [
+        (None, False),
+        ("", False),
+        ('"other"', False),
+        ('"tag"', True),
+        ('W/"tag"', True),
+        ('"other", "tag"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matching(if_none_match, matches):
+    assert etag_matches(if_none_match, '"tag"') is matches
+
+
+def test_etag_depends_on_every_part():
+    assert make_etag("users/me", 1) == make_etag("users/me", 1)
+    assert make_etag("users/me", 1) != make_etag("users/me", 2)
+    assert make_etag("users/me", 1) != make_etag("users", 1)
+
+
+def test_matching_etag_skips_rendering():
+    etag = make_etag("resource", 1)
+
+    def render():
+        raise AssertionError("rendered a 304")
+
+    response = conditional_response(make_request(etag), render, etag=etag)
+
+    assert response.status_code == 304
+    assert response.body == b""
+    assert response.headers["etag"] == etag
+    assert response.headers["cache-control"] == "private, no-cache"
+
+
+def test_body_hash_is_the_etag_by_default():
+    render = lambda: JSONResponse({"data": 1})  # noqa: E731
+
+    first = conditional_response(make_request(), render)
+    again = conditional_response(make_request(first.headers["etag"]), render)
+    changed = conditional_response(
+        make_request(first.headers["etag"]),
+        lambda: JSONResponse({"data": 2}),
+    )
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != first.headers["etag"]
+
+
+async def test_profile_is_revalidated_with_if_none_match(client, tokens):
+    headers = bearer(tokens["access_token"])
+    first = await client.get("/api/users/me", headers=headers)
+
+    again = await client.get(
+        "/api/users/me",
+        headers={**headers, "If-None-Match": first.headers["etag"]},
+    )
+
+    assert first.status_code == 200
+    assert first.headers["vary"] == "Authorization"
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+async def test_other_users_do_not_share_etags(client, tokens):
+    me = await client.get("/api/users/me", headers=bearer(tokens["access_token"]))
+    name = uuid.uuid4().hex[:12]
+    other = await client.post(
+        "/api/auth/jwt/register",
+        json={
+            "username": name,
+            "email": f"{name}@example.com",
+            "password": "correct-horse-battery",
+        },
+    )
+
+    response = await client.get(
+        "/api/users/me",
+        headers={
+            **bearer(other.json()["access_token"]),
+            "If-None-Match": me.headers["etag"],
+        },
+    )
+
+    assert response.status_code == 200
+
+
+async def test_batch_lookup_tag_follows_the_returned_users(client, tokens):
+    headers = bearer(tokens["access_token"])
+    user_id = (await client.get("/api/users/me", headers=headers)).json()["id"]
+    first = await client.get("/api/users", params={"ids": user_id}, headers=headers)
+
+    again = await client.get(
+        "/api/users",
+        params={"ids": user_id},
+        headers={**headers, "If-None-Match": first.headers["etag"]},
+    )
+    different = await client.get(
+        "/api/users",
+        params={"ids": f"{user_id},00000000-0000-0000-0000-000000000000"},
+        headers={**headers, "If-None-Match": first.headers["etag"]},
+    )
+
+    assert first.status_code == 200
+    assert again.status_code == 304
+    # The unknown id is left out, so the body and its tag stay the same.
+    assert different.status_code == 304
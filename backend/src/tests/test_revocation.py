@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import pytest
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from fastapi import HTTPException
+
+from conftest import bearer
+from src.services.revocation import BloomFilter, RevocationList
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def server():
+    return FakeServer()
+
+
+@pytest.fixture
+def revocations(server):
+    return RevocationList(redis=FakeRedis(server=server, decode_responses=True))
+
+
+async def wait_until(condition, timeout: float = 2) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+async def test_revoked_token_is_reported(revocations):
+    await revocations.revoke("revoked", time.time() + 60)
+
+    assert await revocations.is_revoked("revoked")
+    assert not await revocations.is_revoked("valid")
+
+
+async def test_rebuild_keeps_only_unexpired_revocations(revocations):
+    await revocations.revoke("expired", time.time() - 1)
+    await revocations.revoke("active", time.time() + 60)
+
+    await revocations.rebuild()
+
+    assert revocations.loaded
+    assert "active" in revocations.bloom
+    assert "expired" not in revocations.bloom
+
+
+async def test_revocations_reach_other_workers(server, revocations):
+    other = RevocationList(redis=FakeRedis(server=server, decode_responses=True))
+    listener = asyncio.create_task(other.listen())
+    try:
+        await wait_until(lambda: other.loaded)
+        await revocations.revoke("revoked", time.time() + 60)
+        await wait_until(lambda: "revoked" in other.bloom)
+    finally:
+        listener.cancel()
+
+
+async def test_filter_miss_is_answered_locally_while_subscribed(server, revocations):
+    listener = asyncio.create_task(revocations.listen())
+    try:
+        await wait_until(lambda: revocations.subscribed)
+        server.connected = False
+
+        assert not await revocations.is_revoked("valid")
+    finally:
+        listener.cancel()
+        server.connected = True
+
+
+async def test_filter_is_not_trusted_without_a_subscription(server, revocations):
+    await revocations.rebuild()
+    other = RevocationList(redis=FakeRedis(server=server, decode_responses=True))
+    # Published while `revocations` was not listening.
+    await other.revoke("missed", time.time() + 60)
+
+    assert "missed" not in revocations.bloom
+    assert await revocations.is_revoked("missed")
+
+
+async def test_lost_subscription_sends_checks_to_redis(server, revocations, caplog):
+    listener = asyncio.create_task(revocations.listen())
+    try:
+        await wait_until(lambda: revocations.subscribed)
+        server.connected = False
+        await wait_until(
+            lambda: "Revocation listener disconnected" in caplog.messages,
+            timeout=5,
+        )
+
+        assert revocations.loaded
+        assert not revocations.subscribed
+        with pytest.raises(HTTPException) as error:
+            await revocations.is_revoked("valid")
+        assert error.value.status_code == 503
+    finally:
+        listener.cancel()
+        server.connected = True
+
+
+async def test_redis_outage_is_unavailable_not_revoked(server, revocations):
+    await revocations.revoke("maybe", time.time() + 60)
+    revocations.loaded = True
+    server.connected = False
+
+    with pytest.raises(HTTPException) as error:
+        await revocations.is_revoked("maybe")
+
+    assert error.value.status_code == 503
+
+
+async def test_logout_revokes_the_access_token(client, tokens):
+    headers = bearer(tokens["access_token"])
+    assert (await client.get("/api/users/me", headers=headers)).status_code == 200
+
+    response = await client.post("/api/auth/logout", headers=headers)
+
+    assert response.status_code == 204
+    me = await client.get("/api/users/me", headers=headers)
+    assert me.status_code == 401
+    assert me.json()["detail"] == "Token has been revoked"
+
+
+async def test_logout_leaves_other_sessions_alone(client, tokens):
+    refreshed = (
+        await client.post(
+            "/api/auth/jwt/refresh",
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+    ).json()
+
+    await client.post("/api/auth/logout", headers=bearer(tokens["access_token"]))
+
+    me = await client.get("/api/users/me", headers=bearer(refreshed["access_token"]))
+    assert me.status_code == 200
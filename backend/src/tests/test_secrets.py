@@ -0,0 +1,152 @@
+import json
+import os
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+from src.core.config.secrets import EncryptedFileCache, FileBackend, SecretsProvider
+
+pytestmark = pytest.mark.anyio
+
+SECRETS = {
+    "app": {"TEST_SECRET_TOKEN": "first", "TEST_SECRET_PORT": 8000},
+    "db": {"TEST_SECRET_DB_PASSWORD": "hunter2"},
+}
+
+
+@pytest.fixture(autouse=True)
+def environ():
+    """
+    Providers write os.environ directly; put it back after each test.
+    """
+    saved = dict(os.environ)
+    yield
+    os.environ.clear()
+    os.environ.update(saved)
+
+
+@pytest.fixture
+def secrets_file(tmp_path):
+    path = tmp_path / "secrets.json"
+    path.write_text(json.dumps(SECRETS))
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EncryptedFileCache(
+        str(tmp_path / "cache" / "secrets.bin"), Fernet.generate_key()
+    )
+
+
+class CountingBackend(FileBackend):
+    def __init__(self, path):
+        super().__init__(path)
+        self.fetches = 0
+        self.failing = False
+
+    def fetch(self, name: str) -> dict[str, str]:
+        self.fetches += 1
+        if self.failing:
+            raise ConnectionError("secrets backend is down")
+        return super().fetch(name)
+
+
+def test_file_backend_loads_into_the_environment(secrets_file):
+    provider = SecretsProvider(FileBackend(str(secrets_file)), ["app", "db"])
+
+    provider.load()
+
+    assert os.environ["TEST_SECRET_TOKEN"] == "first"
+    assert os.environ["TEST_SECRET_PORT"] == "8000"
+    assert os.environ["TEST_SECRET_DB_PASSWORD"] == "hunter2"
+
+
+def test_environment_wins_over_secrets(secrets_file):
+    os.environ["TEST_SECRET_TOKEN"] = "explicit"
+    provider = SecretsProvider(FileBackend(str(secrets_file)), ["app"])
+
+    provider.load()
+
+    assert os.environ["TEST_SECRET_TOKEN"] == "explicit"
+
+
+def test_missing_secret_fails_the_load(secrets_file):
+    provider = SecretsProvider(FileBackend(str(secrets_file)), ["app", "missing"])
+
+    with pytest.raises(KeyError):
+        provider.load()
+
+
+def test_cache_round_trip_is_encrypted(cache):
+    cache.write(SECRETS)
+
+    assert b"hunter2" not in cache.path.read_bytes()
+    assert cache.read(max_age=60) == json.loads(json.dumps(SECRETS))
+    other_key = EncryptedFileCache(str(cache.path), Fernet.generate_key())
+    assert other_key.read(max_age=60) is None
+
+
+def test_cache_is_shared_between_loads(secrets_file, cache):
+    backend = CountingBackend(str(secrets_file))
+
+    SecretsProvider(backend, ["app", "db"], cache=cache).load()
+    SecretsProvider(backend, ["app", "db"], cache=cache).load()
+
+    assert backend.fetches == 2  # one per secret, by the first load only
+
+
+def test_expired_cache_is_used_when_the_backend_fails(secrets_file, cache):
+    hour_ago = int(time.time()) - 3600
+    cache.path.parent.mkdir(parents=True)
+    cache.path.write_bytes(
+        cache.fernet.encrypt_at_time(json.dumps(SECRETS).encode(), hour_ago)
+    )
+    backend = CountingBackend(str(secrets_file))
+    backend.failing = True
+    provider = SecretsProvider(backend, ["app"], cache=cache, cache_ttl_seconds=60)
+
+    provider.load()
+
+    assert os.environ["TEST_SECRET_TOKEN"] == "first"
+
+
+def rotate(secrets_file, **app) -> None:
+    secrets_file.write_text(json.dumps({**SECRETS, "app": app}))
+
+
+async def test_refresh_applies_changes_and_notifies(secrets_file):
+    provider = SecretsProvider(FileBackend(str(secrets_file)), ["app"])
+    provider.load()
+    notified = []
+    provider.on_change(lambda: notified.append(os.environ["TEST_SECRET_TOKEN"]))
+
+    assert not await provider.refresh()
+    rotate(secrets_file, TEST_SECRET_TOKEN="second")
+
+    assert await provider.refresh()
+    assert notified == ["second"]
+    # Dropped from the secret, so dropped from the environment.
+    assert "TEST_SECRET_PORT" not in os.environ
+
+
+async def test_failed_reload_is_undone_and_retried(secrets_file):
+    provider = SecretsProvider(FileBackend(str(secrets_file)), ["app"])
+    provider.load()
+    failures = [ValueError("rotated value does not validate")]
+
+    def reload_config():
+        if failures:
+            raise failures.pop()
+
+    provider.on_change(reload_config)
+    rotate(secrets_file, TEST_SECRET_TOKEN="second")
+
+    with pytest.raises(ValueError):
+        await provider.refresh()
+    assert os.environ["TEST_SECRET_TOKEN"] == "first"
+    assert os.environ["TEST_SECRET_PORT"] == "8000"
+
+    assert await provider.refresh()
+    assert os.environ["TEST_SECRET_TOKEN"] == "second"
@@ -0,0 +1,157 @@
+import json
+
+import pytest
+
+from src.services.hashing import PasswordHasher
+from src.services.user_import import UserImporter, iter_lines, parse_rows
+
+pytestmark = pytest.mark.anyio
+
+HASH = "$2b$04$" + "a" * 53
+WALLET = "0x" + "ab" * 20
+
+
+class InMemoryImporter(UserImporter):
+    """
+    The Postgres COPY and ON CONFLICT merge replaced by a dict keyed like
+    the table's unique key.
+    """
+
+    def __init__(self, existing=(), **kwargs):
+        super().__init__(engine=None, **kwargs)
+        self.rows = dict.fromkeys(existing)
+
+    async def _load(self, records):
+        key_index = self.table.columns.index(self.table.key)
+        conflicts = []
+        for record in records:
+            key = record[key_index]
+            if key in self.rows:
+                conflicts.append(key)
+            else:
+                self.rows[key] = record
+        return len(records) - len(conflicts), conflicts
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(max_workers=2, max_pending=1)
+    hasher.rounds = 4
+    yield hasher
+    hasher.shutdown()
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def import_lines(importer: UserImporter, lines: list[dict | str]) -> dict:
+    body = "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    ).encode()
+    report = None
+    async with importer:
+        async for report in importer.run(parse_rows(iter_lines(chunks(body)), "jsonl")):
+            pass
+    return report.as_dict()
+
+
+def user(name: str, **fields) -> dict:
+    return {"username": name, "email": f"{name}@example.com", **fields}
+
+
+async def test_lines_split_inside_a_character():
+    data = "ä\nb\n".encode()
+
+    lines = [line async for line in iter_lines(chunks(data[:1], data[1:]))]
+
+    assert lines == ["ä", "b"]
+
+
+async def test_conflicts_are_counted_and_listed_alike(hasher):
+    importer = InMemoryImporter(
+        existing=["taken@example.com"], chunk_size=10, hasher=hasher
+    )
+
+    report = await import_lines(
+        importer,
+        [
+            user("new", hashed_password=HASH),
+            user("new", hashed_password=HASH),  # repeated in the chunk
+            user("taken", hashed_password=HASH),  # already in the table
+            user("other", password="correct-horse-battery"),
+        ],
+    )
+
+    assert report["processed"] == 4
+    assert report["inserted"] == 2
+    assert report["conflicts"] == 2
+    assert sorted(report["conflicting_keys"]) == [
+        "new@example.com",
+        "taken@example.com",
+    ]
+
+
+async def test_conflicts_across_chunks(hasher):
+    importer = InMemoryImporter(chunk_size=2, hasher=hasher)
+
+    report = await import_lines(
+        importer,
+        [user(name, hashed_password=HASH) for name in ("a", "b", "a", "c", "b")],
+    )
+
+    assert report["inserted"] == 3
+    assert report["conflicts"] == 2
+    assert report["conflicting_keys"] == ["a@example.com", "b@example.com"]
+
+
+async def test_passwords_are_hashed_with_the_hasher_rounds(hasher):
+    importer = InMemoryImporter(chunk_size=10, workers=2, hasher=hasher)
+
+    # Two at a time against max_pending=1: the import waits instead of
+    # failing with 503.
+    await import_lines(
+        importer,
+        [user(f"user{i}", password="correct-horse-battery") for i in range(3)],
+    )
+
+    hashes = [record[3] for record in importer.rows.values()]
+    assert len(hashes) == 3
+    assert all(hashed.startswith("$2b$04$") for hashed in hashes)
+
+
+async def test_wallets_differing_in_case_conflict():
+    importer = InMemoryImporter(table="web3_users", chunk_size=10)
+
+    report = await import_lines(
+        importer,
+        [{"wallet_address": WALLET}, {"wallet_address": "0x" + WALLET[2:].upper()}],
+    )
+
+    assert report["inserted"] == 1
+    assert report["conflicts"] == 1
+    assert report["conflicting_keys"] == [WALLET]
+
+
+async def test_bad_rows_are_reported_not_imported(hasher):
+    importer = InMemoryImporter(chunk_size=10, hasher=hasher)
+
+    report = await import_lines(
+        importer,
+        [
+            "{not json",
+            {"username": "nameless"},
+            user("weak", hashed_password="plaintext"),
+            user("nopass"),
+        ],
+    )
+
+    assert report["inserted"] == 0
+    assert report["errors"] == 4
+    assert report["error_details"] == [
+        "line 1: malformed row",
+        "line 2: missing username or email",
+        "line 3: invalid bcrypt hash",
+        "line 4: missing password",
+    ]